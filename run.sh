@@ -12,9 +12,8 @@ tmax=${5:-240}
 dt=${6:-1}
 seed=${7:-42}
 
-python -m src.cli simulate --mode "$mode" --isotope "$iso" --half-life-unit "$unit" \
-  --n0 "$n0" --tmax "$tmax" --dt "$dt" --seed "$seed" --plot
-
-python -m src.cli analyze --run-dir data/runs/last --out images
+# simulate -> analyze -> plot in a single Python process
+python -m src.cli pipeline --mode "$mode" --isotope "$iso" --half-life-unit "$unit" \
+  --n0 "$n0" --tmax "$tmax" --dt "$dt" --seed "$seed" --out images
 
 echo "✔ Done → data/runs/last (data), images/ (plots)"
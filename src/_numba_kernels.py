@@ -0,0 +1,25 @@
+import numpy as np
+from numba import njit, prange
+# Numba kernels; imported on first use so `import src.simulate` never pays for numba
+
+
+@njit(parallel=True, cache=True)
+def simulate_numba(N0, p, seeds, traj):
+    """
+    JIT-compiled binomial kernel filling traj (R x steps) in place.
+
+    Realizations run in parallel with prange; each one reseeds its thread's
+    generator with seeds[r] first, so the output depends only on `seeds`
+    (hence on the caller's rng), not on thread count or scheduling.
+    Compiled code is cached to disk, so the JIT cost is paid once per install
+    (once per traj dtype: the integer count dtypes and float64 all work).
+    """
+    R, steps = traj.shape
+    for r in prange(R):
+        np.random.seed(seeds[r])
+        N = N0
+        traj[r, 0] = N
+        for k in range(1, steps):
+            if N > 0:
+                N -= np.random.binomial(N, p)
+            traj[r, k] = N
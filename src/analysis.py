@@ -1,6 +1,7 @@
 import numpy as np
-from scipy import stats
+from dataclasses import dataclass
 # Helper functions for averages, confidence intervals, and lambda fit
+# (scipy is imported where used, keeping module import cheap)
 
 def mean_and_ci(traj, alpha=0.05):
     """
@@ -20,6 +21,7 @@ def mean_and_ci(traj, alpha=0.05):
     half : np.ndarray
         Half-width of confidence interval
     """
+    from scipy import stats
     m = traj.mean(axis=0)
     s = traj.std(axis=0, ddof=1)
     n = traj.shape[0]
@@ -32,6 +34,9 @@ def fit_lambda_from_counts(t, counts):
     """
     Fit lambda by linear regression on log(N(t)).
 
+    Unweighted and blind to zero counts; fit_lambda_binomial (survivor
+    curves) and fit_lambda_poisson (counts per bin) are the likelihood fits.
+
     Parameters
     ----------
     t : np.ndarray
@@ -48,8 +53,343 @@ def fit_lambda_from_counts(t, counts):
     r2 : float
         R^2 of the fit
     """
+    from scipy import stats
     mask = counts > 0
     slope, intercept, r, *_ = stats.linregress(t[mask], np.log(counts[mask]))
     lam_hat = -slope
     N0_hat = np.exp(intercept)
     return lam_hat, N0_hat, r**2
+
+
+class RunningStats:
+    """
+    Running per-time-step mean, variance, min and max across realizations.
+
+    Values for step k arrive in batches via push(k, values) and are folded in
+    with the Welford/Chan update, so memory is O(steps) no matter how many
+    realizations are seen; two instances (e.g. shards) combine with merge().
+    k may also be a slice of steps, with values a (batch x steps) block.
+    """
+
+    def __init__(self, steps: int):
+        self.n = np.zeros(steps, dtype=np.int64)
+        self.mean = np.zeros(steps)
+        self.m2 = np.zeros(steps)
+        self.min = np.full(steps, np.inf)
+        self.max = np.full(steps, -np.inf)
+
+    def push(self, k, values):
+        x = np.asarray(values, dtype=float)
+        if x.shape[0] == 0:
+            return
+        mb = x.mean(axis=0)
+        d = x - mb
+        m2b = d @ d if x.ndim == 1 else np.einsum("ij,ij->j", d, d)
+        self._combine(k, x.shape[0], mb, m2b, x.min(axis=0), x.max(axis=0))
+
+    def merge(self, other: "RunningStats"):
+        self._combine(slice(None), other.n, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def _combine(self, k, nb, mb, m2b, lo, hi):
+        na = self.n[k]
+        n = na + nb
+        delta = mb - self.mean[k]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frac = np.where(n > 0, nb / np.maximum(n, 1), 0.0)
+        self.mean[k] = self.mean[k] + delta * frac
+        self.m2[k] = self.m2[k] + m2b + delta * delta * na * frac
+        self.n[k] = n
+        self.min[k] = np.minimum(self.min[k], lo)
+        self.max[k] = np.maximum(self.max[k], hi)
+
+    @property
+    def var(self):
+        """Sample variance (ddof=1), as used by mean_and_ci."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.m2 / (self.n - 1)
+
+    def mean_and_ci(self, alpha=0.05):
+        """Same (mean, half-width) pair as mean_and_ci(traj, alpha)."""
+        from scipy import stats
+        n = self.n
+        tcrit = stats.t.ppf(1 - alpha/2, df=n-1)
+        half = tcrit * np.sqrt(self.var) / np.sqrt(n)
+        return self.mean, half
+
+
+class Trajectories:
+    """
+    Compact (realizations x time) counts with lazily computed summaries.
+
+    counts keeps whatever dtype the engine produced (int32 for
+    simulate_isotope with N0 < 2^31), so a run costs 4 bytes per point
+    instead of 8; mean, std and mean_and_ci are computed in float64 on first
+    use and cached. from_run() memory-maps a saved traj instead of loading it,
+    in its stored dtype (uint16 on disk for N0 < 65536): use the summaries,
+    or np.asarray(tr, dtype=np.int64) before taking differences.
+    """
+
+    __slots__ = ("t", "counts", "_mean", "_ci")
+
+    def __init__(self, t, counts):
+        self.t = np.asarray(t, dtype=float)
+        self.counts = np.asarray(counts)      # no copy, also for a memory-mapped traj
+        if self.counts.ndim != 2 or self.counts.shape[1] != self.t.size:
+            raise ValueError("counts must have shape (n_realizations, len(t))")
+        self._mean = None
+        self._ci = {}
+
+    @classmethod
+    def from_run(cls, run_dir):
+        from .runreader import load_array
+        return cls(load_array(run_dir, "t"), load_array(run_dir, "traj", mmap=True))
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.counts, dtype=dtype)
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes
+
+    @property
+    def mean(self):
+        """Mean over realizations (float64, cached)."""
+        if self._mean is None:
+            self._mean = self.counts.mean(axis=0, dtype=np.float64)
+        return self._mean
+
+    def mean_and_ci(self, alpha=0.05):
+        """(mean, CI half-width) like mean_and_ci(traj, alpha), cached per alpha."""
+        if alpha not in self._ci:
+            from scipy import stats
+            n = len(self)
+            s = self.counts.std(axis=0, ddof=1, dtype=np.float64)
+            self._ci[alpha] = stats.t.ppf(1 - alpha/2, df=n-1) * s / np.sqrt(n)
+        return self.mean, self._ci[alpha]
+
+
+@dataclass
+class LambdaFit:
+    """
+    Maximum-likelihood decay fit; every field is a scalar or has the batch
+    shape of the input (one entry per fitted series).
+
+    cov is the (..., 2, 2) covariance of (N0_hat, lam_hat).
+    """
+    lam: np.ndarray
+    se: np.ndarray
+    N0: np.ndarray
+    cov: np.ndarray
+    n_iter: int
+
+    @property
+    def half_life(self):
+        return np.log(2) / self.lam
+
+    @property
+    def half_life_se(self):
+        """Delta-method standard error of T½ = ln 2 / λ."""
+        return np.log(2) * self.se / self.lam**2
+
+
+def _grid(t, y):
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if t.ndim != 1 or y.shape[-1] != t.size or t.size < 2:
+        raise ValueError("counts must have shape (..., len(t)) with len(t) >= 2")
+    return t, y
+
+
+def fit_lambda_binomial(t, N, n_realizations=1, tol=1e-10, max_iter=50):
+    """
+    Exact MLE of λ from survivor counts N(t) (one series per row).
+
+    Each step is a binomial thinning: N_k ~ Binomial(N_{k-1}, exp(-λ Δ_k)),
+    so every point is weighted by the information it carries and zero-count
+    bins are kept rather than dropped. On a uniform grid the MLE is closed
+    form, q̂ = Σ N_k / Σ N_{k-1}; otherwise a vectorized Newton iteration on
+    the analytic gradient is used.
+
+    Parameters
+    ----------
+    t : np.ndarray
+        Time grid (any increasing grid).
+    N : np.ndarray
+        Survivor counts, shape (..., len(t)); a mean curve of R realizations
+        gives the pooled MLE when n_realizations=R.
+    n_realizations : int or np.ndarray
+        Realizations averaged into each row (scales the information).
+
+    Returns
+    -------
+    LambdaFit
+        λ̂, its standard error (inverse Fisher information) and the
+        covariance of (N0, λ̂); N0 is the observed N(t0), so only λ varies.
+    """
+    t, N = _grid(t, N)
+    dt = np.diff(t)
+    prev, cur = N[..., :-1], N[..., 1:]
+    R = np.asarray(n_realizations, dtype=float)
+    n_iter = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if np.allclose(dt, dt[0]):
+            lam = -np.log(cur.sum(axis=-1) / prev.sum(axis=-1)) / dt[0]
+        else:
+            D = prev - cur
+            lam = -np.log(cur.sum(axis=-1) / prev.sum(axis=-1)) / dt.mean()
+            for n_iter in range(1, max_iter + 1):
+                q = np.exp(-lam[..., None] * dt)
+                g = (dt * (D * q / -np.expm1(-lam[..., None] * dt) - cur)).sum(axis=-1)
+                h = -(D * dt**2 * q / np.expm1(-lam[..., None] * dt)**2).sum(axis=-1)
+                step = np.where(h < 0, g / h, 0.0)
+                lam = np.maximum(lam - step, lam / 10)
+                if np.all(~np.isfinite(step) | (np.abs(step) <= tol * np.abs(lam))):
+                    break
+        q = np.exp(-lam[..., None] * dt)
+        info = R * (prev * dt**2 * q / -np.expm1(-lam[..., None] * dt)).sum(axis=-1)
+        se = 1.0 / np.sqrt(info)
+    cov = np.zeros(np.shape(lam) + (2, 2))
+    cov[..., 1, 1] = se**2
+    return LambdaFit(lam=lam, se=se, N0=N[..., 0], cov=cov, n_iter=n_iter)
+
+
+def fit_lambda_poisson(t, counts, n_realizations=1, tol=1e-10, max_iter=100):
+    """
+    Poisson MLE of (N0, λ) for independent counts with mean N0·exp(-λ t).
+
+    This is the weighted (GLM) replacement for regressing log counts: zero
+    bins stay in the likelihood and late, low-count bins get little weight.
+    Fits every row of `counts` at once with Newton steps on the analytic
+    gradient and Fisher information.
+
+    Parameters
+    ----------
+    t : np.ndarray
+        Time of each bin.
+    counts : np.ndarray
+        Counts, shape (..., len(t)); a mean over R series with n_realizations=R.
+    n_realizations : int or np.ndarray
+        Series averaged into each row (the fit uses total counts).
+
+    Returns
+    -------
+    LambdaFit
+        with cov the inverse Fisher information of (N0, λ).
+    """
+    t, y = _grid(t, counts)
+    R = np.asarray(n_realizations, dtype=float)
+    y = y * R[..., None] if R.ndim else y * R
+    # start from a count-weighted log-linear fit (positive bins only)
+    w = np.where(y > 0, y, 0.0)
+    ly = np.log(np.where(y > 0, y, 1.0))
+    sw, st, sy = w.sum(-1), (w * t).sum(-1), (w * ly).sum(-1)
+    stt, sty = (w * t * t).sum(-1), (w * t * ly).sum(-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (sw * sty - st * sy) / (sw * stt - st**2)
+        a = (sy - slope * st) / sw
+    lam = np.where(np.isfinite(slope), -slope, 0.0)
+    a = np.where(np.isfinite(a), a, 0.0)
+
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        mu = np.exp(a[..., None] - lam[..., None] * t)
+        r = y - mu
+        ga, gl = r.sum(-1), -(t * r).sum(-1)
+        Iaa, Ial, Ill = mu.sum(-1), -(t * mu).sum(-1), (t * t * mu).sum(-1)
+        det = Iaa * Ill - Ial**2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            da = (Ill * ga - Ial * gl) / det
+            dl = (Iaa * gl - Ial * ga) / det
+        a, lam = a + da, lam + dl
+        if np.all(~np.isfinite(dl) | (np.abs(dl) <= tol * np.maximum(np.abs(lam), 1e-300))):
+            break
+
+    mu = np.exp(a[..., None] - lam[..., None] * t)
+    Iaa, Ial, Ill = mu.sum(-1), -(t * mu).sum(-1), (t * t * mu).sum(-1)
+    det = Iaa * Ill - Ial**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_a, var_l, cov_al = Ill / det, Iaa / det, -Ial / det
+    N0 = np.exp(a) / R
+    # (N0, λ) covariance via dN0/da = N0 (delta method), rescaled to per-series units
+    cov = np.empty(np.shape(lam) + (2, 2))
+    cov[..., 0, 0] = N0**2 * var_a * R
+    cov[..., 0, 1] = cov[..., 1, 0] = N0 * cov_al
+    cov[..., 1, 1] = var_l
+    return LambdaFit(lam=lam, se=np.sqrt(var_l), N0=N0, cov=cov, n_iter=n_iter)
+
+
+def _pooling_stats(t, rows):
+    """
+    Per-row statistics that add up across realizations to the pooled fit.
+
+    On a uniform grid the binomial MLE only needs (Σ N_{k-1}, Σ N_k), which is
+    the survivor curve of a single step of length dt; otherwise every column is
+    kept. Returns (t_stats, stats) with stats of shape (rows, len(t_stats)).
+    """
+    dt = np.diff(t)
+    if np.allclose(dt, dt[0]):
+        stats = np.stack([rows[:, :-1].sum(axis=1), rows[:, 1:].sum(axis=1)], axis=1)
+        return np.array([0.0, dt[0]]), stats
+    return t, np.asarray(rows, dtype=float)
+
+
+def fit_realizations(t, chunks):
+    """
+    Fit λ to every realization and collect pooling statistics for the bootstrap.
+
+    Parameters
+    ----------
+    t : np.ndarray
+        Time grid.
+    chunks : iterable of np.ndarray
+        Row blocks of traj, e.g. traj itself or RunReader.row_chunks().
+
+    Returns
+    -------
+    lam : np.ndarray
+        λ̂ per realization (inf when a run decays completely in one step,
+        NaN when it starts empty).
+    t_stats, stats : np.ndarray
+        See _pooling_stats; bootstrap_half_life resamples the rows of stats.
+    """
+    t = np.asarray(t, dtype=float)
+    if isinstance(chunks, np.ndarray):
+        chunks = [chunks]
+    lams, stats = [], []
+    for rows in chunks:
+        rows = np.asarray(rows, dtype=float)
+        lams.append(fit_lambda_binomial(t, rows).lam)
+        t_stats, s = _pooling_stats(t, rows)
+        stats.append(s)
+    return np.concatenate(lams), t_stats, np.concatenate(stats)
+
+
+def bootstrap_half_life(t_stats, stats, n_boot=1000, alpha=0.05, rng=None, batch=64):
+    """
+    Percentile bootstrap CI for the pooled λ̂ and T½ over realizations.
+
+    Each replicate resamples the R realizations with replacement and refits
+    the pooled curve. Replicates are drawn `batch` at a time: the resampled
+    indices become per-realization counts (one bincount) and the pooled
+    statistics one matrix product, so the cost is O(n_boot · R) with no
+    loop over realizations.
+
+    Returns
+    -------
+    dict with the replicate lam array and the (lo, hi) CIs of λ and T½.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    R = stats.shape[0]
+    lam = np.empty(n_boot)
+    for b0 in range(0, n_boot, batch):
+        b = min(batch, n_boot - b0)
+        idx = rng.integers(0, R, size=(b, R)) + R * np.arange(b)[:, None]
+        w = np.bincount(idx.ravel(), minlength=b * R).reshape(b, R).astype(float)
+        lam[b0:b0 + b] = fit_lambda_binomial(t_stats, w @ stats).lam
+    q = 100 * np.array([alpha / 2, 1 - alpha / 2])
+    lam_ci = np.nanpercentile(lam, q)
+    return {"lam": lam, "lambda_ci": lam_ci, "half_life_ci": np.log(2) / lam_ci[::-1]}
@@ -1,21 +1,10 @@
 import argparse, os, json
 import numpy as np
-import matplotlib.pyplot as plt
-
-def load_series(run_dir: str):
-    t = np.load(os.path.join(run_dir, "t.npy"))
-    N = None
-    for cand in ("N.npy","counts.npy"):
-        p = os.path.join(run_dir, cand)
-        if os.path.exists(p):
-            N = np.load(p).astype(float); break
-    if N is None:
-        p = os.path.join(run_dir, "traj.npy")
-        if os.path.exists(p):
-            N = np.load(p).mean(axis=0).astype(float)
-        else:
-            raise SystemExit("No N.npy/counts.npy/traj.npy in run dir.")
-    return t, N
+from . import instrument
+from .analysis import bootstrap_half_life, fit_lambda_binomial, fit_realizations
+from .runreader import RunReader, load_series
+
+METHODS = ("mle", "loglinear")
 
 def fit_lambda(t, N):
     msk = N > 0
@@ -27,36 +16,131 @@ def fit_lambda(t, N):
     half = np.log(2) / lam_hat if lam_hat > 0 else np.nan
     return lam_hat, half, (m, c), msk
 
+def analyze(t, N, run_dir=None, out="images", n_realizations=1, method="mle", exact=False):
+    """
+    Fit λ and T½ to a mean curve, write fit.json (if run_dir) and the log-fit plot.
+
+    method="mle" (default) is the binomial maximum-likelihood fit of
+    analysis.fit_lambda_binomial: all points (zeros included) weighted by
+    their information, with standard errors from n_realizations pooled
+    curves. method="loglinear" is the old unweighted fit of ln N.
+    exact=True marks a noise-free curve (deterministic runs): the fit is
+    reported with "exact": true and without standard errors or covariance,
+    which would describe sampling noise the curve does not have.
+
+    Returns the report dict that goes into fit.json.
+    """
+    from .plotting import _pyplot
+    plt = _pyplot()
+    os.makedirs(out, exist_ok=True)
+    if method not in METHODS:
+        raise ValueError(f"unknown fit method {method!r}; choose from {METHODS}")
+    msk = N > 0
+    if method == "mle":
+        with instrument.phase("analyze.fit"):
+            fit = fit_lambda_binomial(t, N, n_realizations)
+        lam_hat, half = float(fit.lam), float(fit.half_life)
+        m, c = -lam_hat, float(np.log(fit.N0))
+        rep = {"lambda_hat": lam_hat, "half_life_hat": half, "points_used": int(t.size),
+               "lambda_se": float(fit.se), "half_life_se": float(fit.half_life_se),
+               "cov": fit.cov.tolist(), "n_realizations": int(n_realizations), "method": method}
+        if exact:
+            for k in ("lambda_se", "half_life_se", "cov", "n_realizations"):
+                del rep[k]
+    else:
+        with instrument.phase("analyze.fit"):
+            lam_hat, half, (m, c), msk = fit_lambda(t, N)
+        rep = {"lambda_hat": float(lam_hat), "half_life_hat": float(half), "points_used": int(msk.sum()),
+               "method": method}
+    if exact:
+        rep["exact"] = True
+
+    # Save JSON report
+    if run_dir is not None:
+        with open(os.path.join(run_dir, "fit.json"), "w") as f:
+            json.dump(rep, f, indent=2)
+
+    # Plot log fit
+    with instrument.phase("plot"):
+        x = np.array([t[msk].min(), t[msk].max()])
+        y = m*x + c
+        plt.figure()
+        plt.plot(t[msk], np.log(N[msk]), ".", label="log counts")
+        plt.plot(x, y, label=f"fit slope = {-lam_hat:.4f} (=> λ̂={lam_hat:.4f})")
+        plt.xlabel("Time (simulation units)")
+        plt.ylabel("ln N")
+        plt.title(f"Half-life ≈ {half:.4f} (same units as time)")
+        plt.legend(); plt.grid(True, alpha=0.3); plt.tight_layout()
+        outp = os.path.join(out, "log_fit.png")
+        plt.savefig(outp, dpi=200)
+        plt.close()
+    instrument.count("figures")
+
+    where = f" and JSON to {run_dir}/fit.json" if run_dir is not None else ""
+    se = f" ± {rep['lambda_se']:.2g}" if "lambda_se" in rep else ""
+    print(f"[OK] λ̂={lam_hat:.6f}{se}, T1/2≈{half:.6f}. Saved plot to {outp}{where}")
+    return rep
+
+def analyze_realizations(run_dir, n_boot=1000, alpha=0.05, seed=0):
+    """
+    Fit λ to every realization of a saved run and bootstrap the pooled T½.
+
+    traj is read in row chunks (never whole), each chunk fitted in one
+    vectorized pass. The summary is added to fit.json under "realizations"
+    (spread of single-run estimates) and "bootstrap" (percentile CI of the
+    pooled estimate) and returned.
+    """
+    run = RunReader(run_dir)
+    if not run.has("traj"):
+        raise SystemExit("Per-realization fits need traj in the run dir (not saved by stream runs).")
+    with instrument.phase("analyze.realizations"):
+        lam, t_stats, stats = fit_realizations(run.t, run.row_chunks())
+    with instrument.phase("analyze.bootstrap"):
+        boot = bootstrap_half_life(t_stats, stats, n_boot, alpha, np.random.default_rng(seed))
+
+    ok = np.isfinite(lam) & (lam > 0)
+    half = np.log(2) / lam[ok]
+    q = [100 * alpha / 2, 50, 100 * (1 - alpha / 2)]
+    rep = {
+        "realizations": {
+            "n": int(lam.size), "n_fitted": int(ok.sum()),
+            "lambda_mean": float(lam[ok].mean()), "lambda_std": float(lam[ok].std(ddof=1)),
+            "half_life_percentiles": dict(zip([f"{p:g}" for p in q], np.percentile(half, q).tolist())),
+        },
+        "bootstrap": {
+            "n_boot": int(n_boot), "alpha": alpha,
+            "lambda_ci": boot["lambda_ci"].tolist(), "half_life_ci": boot["half_life_ci"].tolist(),
+            "half_life_se": float(np.nanstd(np.log(2) / boot["lam"], ddof=1)),
+        },
+    }
+    path = os.path.join(run_dir, "fit.json")
+    full = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            full = json.load(f)
+    full.update(rep)
+    with open(path, "w") as f:
+        json.dump(full, f, indent=2)
+    lo, hi = rep["bootstrap"]["half_life_ci"]
+    print(f"[OK] {lam.size} realizations fitted; T1/2 {100*(1-alpha):g}% bootstrap CI [{lo:.6f}, {hi:.6f}]")
+    return rep
+
 def main():
     ap = argparse.ArgumentParser(description="Estimate decay constant and half-life from a saved run")
     ap.add_argument("--run-dir", default="data/runs/last")
     ap.add_argument("--out", default="images")
+    ap.add_argument("--method", choices=METHODS, default="mle",
+                    help="Binomial maximum likelihood (default) or unweighted log-linear fit")
+    ap.add_argument("--per-realization", action="store_true",
+                    help="Also fit every realization and bootstrap a CI for T1/2")
+    ap.add_argument("--n-boot", type=int, default=1000)
     args = ap.parse_args()
 
-    os.makedirs(args.out, exist_ok=True)
-    t, N = load_series(args.run_dir)
-    lam_hat, half, (m,c), msk = fit_lambda(t, N)
-
-    # Save JSON report
-    rep = {"lambda_hat": float(lam_hat), "half_life_hat": float(half), "points_used": int(msk.sum())}
-    with open(os.path.join(args.run_dir, "fit.json"), "w") as f:
-        json.dump(rep, f, indent=2)
-
-    # Plot log fit
-    import numpy as np  # ensure np in this scope
-    x = np.array([t[msk].min(), t[msk].max()])
-    y = m*x + c
-    plt.figure()
-    plt.plot(t[msk], np.log(N[msk]), ".", label="log counts")
-    plt.plot(x, y, label=f"fit slope = {-lam_hat:.4f} (=> λ̂={lam_hat:.4f})")
-    plt.xlabel("Time (simulation units)")
-    plt.ylabel("ln N")
-    plt.title(f"Half-life ≈ {half:.4f} (same units as time)")
-    plt.legend(); plt.grid(True, alpha=0.3); plt.tight_layout()
-    outp = os.path.join(args.out, "log_fit.png")
-    plt.savefig(outp, dpi=200)
-
-    print(f"[OK] λ̂={lam_hat:.6f}, T1/2≈{half:.6f}. Saved plot to {outp} and JSON to {args.run_dir}/fit.json")
+    t, N, meta = load_series(args.run_dir)
+    analyze(t, N, args.run_dir, args.out, meta.get("n_realizations", 1), args.method,
+            exact=meta.get("mode") == "deterministic")
+    if args.per_realization:
+        analyze_realizations(args.run_dir, args.n_boot)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,210 @@
+import csv
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import numpy as np
+# Batch runner: experiment YAML files (config/default.yaml schema) -> parameter
+# grid -> deduplicated single-isotope jobs on a process pool -> one summary table.
+#
+# An experiment file has the keys of config/default.yaml (run_name,
+# random_seed, dt, T, isotopes, monte_carlo, plots, output_dir), optionally
+#   grid:  {dotted.key: [values, ...], ...}   e.g. {dt: [0.1, 0.05], monte_carlo.engine: [binomial, exact]}
+# whose cartesian product is expanded, or a list of such documents under
+# `experiments:`. Keys under `isotopes.` apply to every isotope.
+
+DEFAULTS = {"run_name": "batch", "random_seed": None, "dt": 0.05, "T": 10.0, "time_unit": "s",
+            "output_dir": "data", "monte_carlo": {"n_realizations": 20, "engine": "binomial", "store": "npy"},
+            "plots": {"save": False}}
+SUMMARY_FIELDS = ("label", "isotope", "N0", "lambda", "dt", "T", "realizations", "engine", "seed",
+                  "lambda_hat", "lambda_se", "half_life_hat", "half_life_se", "seconds", "cached", "duplicates",
+                  "run_dir")
+
+
+def load_experiments(paths) -> list:
+    """Read experiment documents from YAML files (one document, or a list under `experiments:`)."""
+    import yaml
+    docs = []
+    for path in paths:
+        with open(path) as f:
+            data = yaml.safe_load(f) or {}
+        for doc in data.get("experiments", [data]):
+            docs.append(dict(doc, source=str(path)))
+    return docs
+
+
+def _merge(base: dict, over: dict) -> dict:
+    out = dict(base)
+    for k, v in over.items():
+        out[k] = _merge(base[k], v) if isinstance(v, dict) and isinstance(base.get(k), dict) else v
+    return out
+
+
+def _set_path(doc: dict, dotted: str, value):
+    head, _, rest = dotted.partition(".")
+    if not rest:
+        doc[head] = value
+    elif isinstance(doc.get(head), list):
+        doc[head] = [_set_path(dict(item), rest, value) for item in doc[head]]
+    else:
+        doc[head] = _set_path(dict(doc.get(head) or {}), rest, value)
+    return doc
+
+
+def expand(doc: dict) -> list:
+    """Cartesian product of doc["grid"] applied to doc (defaults filled in); one config per grid point."""
+    doc = _merge(DEFAULTS, doc)
+    grid = doc.pop("grid", None) or {}
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        cfg = json.loads(json.dumps(doc))          # deep copy
+        for k, v in zip(keys, values):
+            cfg = _set_path(cfg, k, v)
+        cfg["label"] = cfg["run_name"] + "".join(f"[{k}={v}]" for k, v in zip(keys, values))
+        configs.append(cfg)
+    return configs
+
+
+def _lambda(iso: dict, unit: str) -> float:
+    if sum(k in iso for k in ("half_life", "lambda", "preset")) != 1:
+        raise ValueError(f"isotope {iso.get('name')!r}: give exactly one of half_life, lambda or preset")
+    if "preset" in iso:
+        from .presets import preset_lambda
+        return float(preset_lambda(iso["preset"], unit))
+    return float(iso["lambda"]) if "lambda" in iso else float(np.log(2) / iso["half_life"])
+
+
+def jobs_from(configs) -> list:
+    """One job per (config, isotope); seeds derive from random_seed and the isotope's position."""
+    jobs = []
+    for cfg in configs:
+        mc = cfg["monte_carlo"]
+        for i, iso in enumerate(cfg["isotopes"]):
+            seed = cfg["random_seed"]
+            if seed is not None:
+                seed = int(np.random.SeedSequence([int(seed), i]).generate_state(1)[0])
+            jobs.append({
+                "label": cfg["label"], "isotope": iso.get("name", iso.get("preset", f"iso{i}")), "N0": int(iso["N0"]),
+                "lambda": _lambda(iso, cfg["time_unit"]), "dt": float(cfg["dt"]), "T": float(cfg["T"]),
+                "realizations": int(mc["n_realizations"]), "engine": mc["engine"], "store": mc.get("store", "npy"),
+                "seed": seed, "unit": cfg["time_unit"], "plot": bool(cfg["plots"].get("save")),
+            })
+    return jobs
+
+
+def _identity(job: dict) -> str:
+    """What determines a job's numbers (labels and plotting excluded): the dedup key."""
+    return json.dumps({k: v for k, v in job.items() if k not in ("label", "plot")}, sort_keys=True)
+
+
+def _row(job, t, N, run_dir, seconds, cached):
+    from .analysis import fit_lambda_binomial
+    fit = fit_lambda_binomial(t, N, job["realizations"])
+    return {**{k: job[k] for k in SUMMARY_FIELDS if k in job},
+            "lambda_hat": float(fit.lam), "lambda_se": float(fit.se),
+            "half_life_hat": float(fit.half_life), "half_life_se": float(fit.half_life_se),
+            "seconds": round(seconds, 4), "cached": cached, "run_dir": str(run_dir)}
+
+
+def run_job(job: dict) -> dict:
+    """Simulate one job into the run store (worker side, no cache access) and return its summary row."""
+    from .simulate import run
+    from .runreader import load_array
+    t0 = time.perf_counter()
+    t, traj, run_dir = run(job["lambda"], n0=job["N0"], tmax=job["T"], dt=job["dt"], seed=job["seed"],
+                           realizations=job["realizations"], engine=job["engine"], store=job["store"],
+                           meta=_meta(job), cache=False)
+    N = load_array(run_dir, "N") if traj is None else traj.mean(axis=0)
+    return _row(job, t, N, run_dir, time.perf_counter() - t0, False)
+
+
+def _meta(job):
+    return {"unit": job["unit"], "experiment": job["label"], "isotope": job["isotope"]}
+
+
+def run_batch(paths, workers=1, dry_run=False, out=None) -> list:
+    """
+    Load, expand and deduplicate experiments, run them on `workers`
+    processes and write one summary CSV.
+
+    Seeded jobs already in the result cache are not rerun. Each finished run
+    is saved to data/runs/ by its worker as soon as it completes; the parent
+    only records cache entries and collects summary rows. Returns the rows
+    (one per unique job, in submission order).
+    """
+    from . import cache
+    from .decay import Isotope
+    from .runreader import load_series
+    from .simulate import SimConfig, _cache_store, cache_params
+
+    docs = load_experiments(paths)
+    configs = [c for d in docs for c in expand(d)]
+    unique, dups = {}, {}
+    for job in jobs_from(configs):
+        ident = _identity(job)
+        dups[ident] = dups.get(ident, -1) + 1
+        unique.setdefault(ident, job)
+    jobs = list(unique.values())
+    print(f"[batch] {len(configs)} config(s) -> {len(jobs)} unique job(s) "
+          f"({sum(dups.values())} duplicate(s) skipped)")
+    if dry_run:
+        for job in jobs:
+            print(f"  {job['label']} {job['isotope']}: N0={job['N0']} λ={job['lambda']:.6g} dt={job['dt']} "
+                  f"T={job['T']} R={job['realizations']} engine={job['engine']} seed={job['seed']}")
+        return []
+
+    rows, pending = {}, {}
+    for ident, job in unique.items():
+        key = params = None
+        if job["seed"] is not None:
+            iso = Isotope(job["isotope"], N0=job["N0"], lam=job["lambda"])
+            cfg = SimConfig(dt=job["dt"], T=job["T"], n_realizations=job["realizations"], engine=job["engine"],
+                            store=job["store"])
+            params = cache_params(iso, cfg, "mc", {"seed": job["seed"], "workers": 1, **_meta(job)})
+            key = cache.cache_key(params)
+            run_dir = cache.lookup(key)
+            if run_dir is not None:
+                t, N, _ = load_series(run_dir)
+                rows[ident] = _row(job, t, N, run_dir, 0.0, True)
+                continue
+        pending[ident] = (job, key, params)
+
+    def _done(ident, row):
+        job, key, params = pending[ident]
+        _cache_store(key, row["run_dir"], params)
+        rows[ident] = row
+        print(f"[batch] {len(rows)}/{len(jobs)} {job['label']} {job['isotope']}: "
+              f"λ̂={row['lambda_hat']:.6g} ± {row['lambda_se']:.2g} ({row['seconds']:.2f} s)")
+
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(run_job, job): ident for ident, (job, _, _) in pending.items()}
+            for fut in as_completed(futures):
+                _done(futures[fut], fut.result())
+    else:
+        for ident, (job, _, _) in pending.items():
+            _done(ident, run_job(job))
+
+    ordered = [dict(rows[i], duplicates=dups[i]) for i in unique]
+    to_plot = [r["run_dir"] for ident, r in zip(unique, ordered) if unique[ident]["plot"]]
+    if to_plot:
+        from .plotting import render_runs
+        render_runs(to_plot, "images/batch", workers, dpi=100)
+        print(f"[OK] Rendered {len(to_plot)} run(s) into images/batch/<run>/")
+    out = Path(out) if out else Path(configs[0]["output_dir"] if configs else "data") / "batch" / \
+        time.strftime("summary_%Y%m%d-%H%M%S.csv")
+    write_summary(ordered, out)
+    print(f"[OK] Summary of {len(ordered)} run(s) written to {out}")
+    return ordered
+
+
+def write_summary(rows, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        w.writeheader()
+        w.writerows(rows)
+    return path
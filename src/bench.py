@@ -0,0 +1,189 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from importlib.util import find_spec
+from pathlib import Path
+import numpy as np
+# Benchmark suite: a parameter grid over the engines, mixtures, chains and
+# analysis functions, with warm-up (JIT compile, caches) timed separately from
+# steady state, machine-readable JSON and comparison against a stored baseline.
+
+BASELINE = Path(__file__).resolve().parents[1] / "benchmarks" / "baseline.json"
+GRIDS = ("quick", "full")
+
+
+@dataclass
+class Case:
+    """One benchmark: `setup()` builds inputs (untimed) and returns the zero-argument callable to time."""
+    name: str
+    group: str
+    params: dict
+    setup: callable
+
+
+def _engine_case(engine, N0, R, steps):
+    def setup():
+        from .decay import Isotope
+        from .simulate import SimConfig, _run_engine
+        iso = Isotope("X", N0=N0, lam=5.0 / steps)     # ~5 mean lifetimes over the run
+        cfg = SimConfig(dt=1.0, T=steps - 1, n_realizations=R, engine=engine, save=False)
+        rng = np.random.default_rng(0)
+        return lambda: _run_engine(iso, cfg, rng)
+    return Case(f"simulate/{engine}/N0={N0}/R={R}/steps={steps}", "simulate",
+                {"engine": engine, "N0": N0, "R": R, "steps": steps}, setup)
+
+
+def _mixture_case(n_isotopes, N0, R, steps):
+    def setup():
+        from .decay import Isotope
+        from .simulate import SimConfig, simulate_isotopes
+        isos = [Isotope(f"X{i}", N0=N0, lam=(i + 1) * 2.0 / steps) for i in range(n_isotopes)]
+        cfg = SimConfig(dt=1.0, T=steps - 1, n_realizations=R, save=False)
+        rng = np.random.default_rng(0)
+        return lambda: simulate_isotopes(isos, cfg, rng)
+    return Case(f"mixture/n={n_isotopes}/N0={N0}/R={R}/steps={steps}", "mixture",
+                {"n_isotopes": n_isotopes, "N0": N0, "R": R, "steps": steps}, setup)
+
+
+def _chain_case(N0, R, steps):
+    def setup():
+        from .chain import CHAINS, simulate_chain
+        chain = CHAINS["mo99-tc99m"]
+        dt = 200.0 / steps
+        rng = np.random.default_rng(0)
+        return lambda: simulate_chain(chain, [N0, 0], dt, 200.0 - dt, R, rng)
+    return Case(f"chain/mo99-tc99m/N0={N0}/R={R}/steps={steps}", "chain",
+                {"N0": N0, "R": R, "steps": steps}, setup)
+
+
+def _analysis_case(kind, R, steps):
+    def setup():
+        from .decay import Isotope
+        from .simulate import SimConfig, _run_engine
+        iso = Isotope("X", N0=10000, lam=5.0 / steps)
+        t, traj = _run_engine(iso, SimConfig(dt=1.0, T=steps - 1, n_realizations=R, save=False),
+                              np.random.default_rng(0))
+        if kind == "mle":
+            from .analysis import fit_lambda_binomial
+            return lambda: fit_lambda_binomial(t, traj)
+        if kind == "bootstrap":
+            from .analysis import bootstrap_half_life, fit_realizations
+            _, ts, stats = fit_realizations(t, traj)
+            rng = np.random.default_rng(0)
+            return lambda: bootstrap_half_life(ts, stats, 200, rng=rng)
+        from .detector import DetectorModel, fit_detector
+        det = DetectorModel(0.5, 0.0, 2.0)
+        counts = det.measure(t, traj, np.random.default_rng(0))
+        return lambda: fit_detector(t, counts, det)
+    return Case(f"analysis/{kind}/R={R}/steps={steps}", "analysis", {"kind": kind, "R": R, "steps": steps}, setup)
+
+
+def grid_cases(grid="quick") -> list:
+    """Benchmark cases of a named grid ("quick": seconds, for CI; "full": the whole sweep)."""
+    if grid not in GRIDS:
+        raise ValueError(f"unknown grid {grid!r}; choose from {GRIDS}")
+    engines = ["binomial", "exact", "adaptive"] + (["numba"] if find_spec("numba") else [])
+    if grid == "quick":
+        sizes = [(1000, 100, 200), (100000, 100, 200)]
+        cases = [_engine_case(e, *s) for e in engines for s in sizes]
+        cases.append(_engine_case("per_nucleus", 1000, 5, 50))
+        cases.append(_mixture_case(3, 10000, 100, 200))
+        cases.append(_chain_case(10000, 100, 200))
+        cases += [_analysis_case(k, 1000, 200) for k in ("mle", "bootstrap", "detector")]
+        return cases
+    cases = [_engine_case(e, N0, R, steps) for e in engines
+             for N0 in (1000, 10000, 100000) for R in (10, 1000) for steps in (100, 1000)]
+    cases += [_engine_case("per_nucleus", N0, 5, steps) for N0 in (1000, 10000) for steps in (100, 1000)]
+    cases += [_mixture_case(n, 10000, 1000, 1000) for n in (2, 8)]
+    cases += [_chain_case(N0, R, 1000) for N0 in (1000, 100000) for R in (10, 1000)]
+    cases += [_analysis_case(k, R, 1000) for k in ("mle", "bootstrap", "detector") for R in (100, 10000)]
+    return cases
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:          # Windows
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return kb / (2**20 if platform.system() == "Darwin" else 2**10)   # bytes on macOS, KiB on Linux
+
+
+def measure(case: Case, warmup=1, repeat=5) -> dict:
+    """
+    Time one case: `warmup` calls (timed separately; the first includes JIT
+    compilation and cold caches), then `repeat` steady-state calls. Peak
+    traced allocation comes from one extra call under tracemalloc (NumPy
+    reports its buffers to it), kept out of the timings.
+    """
+    fn = case.setup()
+    warm = []
+    for _ in range(warmup):
+        t0 = time.perf_counter()
+        fn()
+        warm.append(time.perf_counter() - t0)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "name": case.name, "group": case.group, "params": case.params,
+        "warmup_s": warm, "min_s": min(times), "median_s": statistics.median(times),
+        "alloc_peak_mb": peak / 2**20, "rss_peak_mb": _peak_rss_mb(),
+    }
+
+
+def run_bench(grid="quick", warmup=1, repeat=5, select=None, quiet=False) -> dict:
+    """Run a grid (optionally only cases whose name contains `select`) and return the report dict."""
+    from .cache import code_version
+    results = []
+    for case in grid_cases(grid):
+        if select and select not in case.name:
+            continue
+        res = measure(case, warmup, repeat)
+        results.append(res)
+        if not quiet:
+            print(f"{res['name']:<52} {res['median_s'] * 1e3:10.2f} ms  "
+                  f"(warm-up {res['warmup_s'][0] * 1e3 if res['warmup_s'] else float('nan'):.1f} ms, "
+                  f"alloc {res['alloc_peak_mb']:.1f} MB)")
+    return {
+        "meta": {"grid": grid, "warmup": warmup, "repeat": repeat, "code": code_version(),
+                 "python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "system": platform.system(),
+                 "date": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance=0.3, floor_s=1e-3) -> list:
+    """
+    Cases slower than baseline by more than `tolerance` (fraction) on their
+    best time and by more than floor_s seconds; returns
+    [(name, baseline_s, current_s)]. Cases missing from either side are skipped.
+    """
+    base = {r["name"]: r["min_s"] for r in baseline.get("results", [])}
+    slow = []
+    for r in current["results"]:
+        b = base.get(r["name"])
+        if b is not None and r["min_s"] > b * (1 + tolerance) and r["min_s"] - b > floor_s:
+            slow.append((r["name"], b, r["min_s"]))
+    return slow
+
+
+def write_json(report: dict, path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+
+def load_json(path) -> dict:
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from .runstore import RUNS_ROOT, update_last
+# Content-addressed result cache over data/runs/
+#
+# A run is keyed on everything that determines its numbers (isotope, N0, λ, dt,
+# T, R, engine, seed, workers, extra meta such as the unit) plus the code
+# version; data/runs/cache.json maps keys to run directories and records when
+# each was last used, which drives LRU eviction. Only runs in that index are
+# listed or evicted: unseeded, extended or otherwise uncached runs are kept.
+
+INDEX = "cache.json"
+VERSION = "0.1.1"
+# every module that shapes what a cached run contains: engines, seeding, saved formats
+_ENGINE_SOURCES = ("simulate.py", "_numba_kernels.py", "parallel.py", "decay.py", "analysis.py",
+                   "runstore.py", "runreader.py", "resume.py", "cache.py")
+
+
+def code_version() -> str:
+    """Package version plus a digest of the simulation and storage sources (changes invalidate the cache)."""
+    h = hashlib.sha256(VERSION.encode())
+    here = Path(__file__).parent
+    for name in _ENGINE_SOURCES:
+        p = here / name
+        if p.exists():
+            h.update(p.read_bytes())
+    return f"{VERSION}+{h.hexdigest()[:12]}"
+
+
+def cache_key(params: dict) -> str:
+    """sha256 of the canonical JSON of params and the code version."""
+    blob = json.dumps({"params": params, "code": code_version()}, sort_keys=True, default=float)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _load_index(root) -> dict:
+    p = Path(root) / INDEX
+    return json.loads(p.read_text()) if p.exists() else {}
+
+
+def _save_index(index: dict, root) -> None:
+    Path(root).mkdir(parents=True, exist_ok=True)
+    tmp = Path(root) / (INDEX + ".tmp")
+    tmp.write_text(json.dumps(index, indent=2))
+    os.replace(tmp, Path(root) / INDEX)
+
+
+def lookup(key: str, root=RUNS_ROOT):
+    """Run directory cached under key (touching its LRU time and data/runs/last), or None."""
+    index = _load_index(root)
+    entry = index.get(key)
+    if entry is None:
+        return None
+    run_dir = Path(root) / entry["run"]
+    if not (run_dir / "meta.json").exists():
+        del index[key]
+        _save_index(index, root)
+        return None
+    entry["last_used"] = time.time()
+    _save_index(index, root)
+    update_last(run_dir, root)
+    print(f"[cache] hit {key[:12]} -> {run_dir}")
+    return run_dir
+
+
+def record(key: str, run_dir, params: dict, root=RUNS_ROOT) -> None:
+    index = _load_index(root)
+    index[key] = {"run": Path(run_dir).name, "params": params, "last_used": time.time()}
+    _save_index(index, root)
+    meta_path = Path(run_dir) / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    meta["cache_key"] = key
+    meta_path.write_text(json.dumps(meta, indent=2))
+
+
+def _dir_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def list_runs(root=RUNS_ROOT) -> list:
+    """[(run_dir, last_used, bytes)] for every cached run under root, least recently used first."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    used = {}
+    for e in _load_index(root).values():
+        used[e["run"]] = max(e["last_used"], used.get(e["run"], 0.0))
+    runs = [root / name for name in used if (root / name).is_dir() and not (root / name).is_symlink()]
+    rows = [(d, used[d.name], _dir_bytes(d)) for d in runs]
+    return sorted(rows, key=lambda r: r[1])
+
+
+def evict(max_runs=None, max_bytes=None, root=RUNS_ROOT) -> list:
+    """
+    Delete least-recently-used cached runs until at most max_runs remain and
+    they take at most max_bytes. Runs not in the cache index are neither
+    counted nor touched, and the run behind data/runs/last is never evicted.
+    Returns the removed directories.
+    """
+    root = Path(root)
+    rows = list_runs(root)
+    last = root / "last"
+    keep = last.resolve() if last.is_symlink() else None
+    total = sum(r[2] for r in rows)
+    removed = []
+    for d, _, size in rows:
+        too_many = max_runs is not None and len(rows) - len(removed) > max_runs
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_many or too_big):
+            break
+        if keep is not None and d.resolve() == keep:
+            continue
+        shutil.rmtree(d)
+        removed.append(d)
+        total -= size
+    if removed:
+        gone = {d.name for d in removed}
+        index = {k: e for k, e in _load_index(root).items() if e["run"] not in gone}
+        _save_index(index, root)
+    return removed
+
+
+def limits_from_env():
+    """(max_runs, max_bytes) from RADDECAY_CACHE_MAX_RUNS / RADDECAY_CACHE_MAX_MB, if set."""
+    runs = os.environ.get("RADDECAY_CACHE_MAX_RUNS")
+    mb = os.environ.get("RADDECAY_CACHE_MAX_MB")
+    return (int(runs) if runs else None), (int(float(mb) * 2**20) if mb else None)
@@ -1,37 +1,15 @@
-# src/cli.py — clean CLI with simulate/plot/analyze/bg/chain
+# src/cli.py — clean CLI with simulate/pipeline/plot/analyze/bg/mixture/chain (all run in-process)
 
 import argparse
 import math
-import subprocess
 import sys
-import os
-import json
-
-PRESETS = {
-    "tc99m": ("h", 6.01),
-    "i131":  ("d", 8.02),
-    "cs137": ("y", 30.05),
-    "co60":  ("y", 5.27),
-    "f18":   ("min", 109.77),
-    "c11":   ("min", 20.334),
-    "n13":   ("min", 9.965),
-    "o15":   ("min", 2.037),
-    "i123":  ("h", 13.22),
-    "tl201": ("h", 73.1),
-    "y90":   ("h", 64.1),
-    "lu177": ("d", 6.65),
-    "xe133": ("d", 5.25),
-    "mo99":  ("h", 66.0),
-    "ba133": ("y", 10.52),
-}
-
-UNIT_SEC = {"s": 1, "min": 60, "h": 3600, "d": 86400, "y": 365.25 * 86400}
-
-
-def _lambda_in_unit_from_half_life(half_life_value: float, half_life_unit: str, out_unit: str) -> float:
-    seconds = half_life_value * UNIT_SEC[half_life_unit]
-    lam_per_sec = math.log(2) / seconds
-    return lam_per_sec * UNIT_SEC[out_unit]
+import time
+
+from .presets import PRESETS, UNIT_SEC, preset_lambda
+from .presets import lambda_in_unit_from_half_life as _lambda_in_unit_from_half_life
+
+# Heavy modules (numpy, scipy, matplotlib, numba) are imported inside the
+# command handlers so `raddecay --help` and argument errors stay instant.
 
 
 def _resolve_lambda(args) -> float:
@@ -41,58 +19,184 @@ def _resolve_lambda(args) -> float:
     if args.half_life is not None:
         return _lambda_in_unit_from_half_life(args.half_life, args.half_life_unit, args.half_life_unit)
     if getattr(args, "isotope", None):
-        preset_unit, preset_hl = PRESETS[args.isotope]
-        out_unit = args.half_life_unit or preset_unit
-        return _lambda_in_unit_from_half_life(preset_hl, preset_unit, out_unit)
+        return preset_lambda(args.isotope, args.half_life_unit)
     raise SystemExit("Provide --lambda OR --half-life (+ unit) OR --isotope")
 
 
-def _run(cmd: list[str]) -> None:
-    print("[cmd]", " ".join(cmd))
-    subprocess.check_call(cmd)
-
-
-def main() -> None:
-    p = argparse.ArgumentParser(description="Run radioactive-decay simulations and plots")
-    p.add_argument("-V", "--version", action="version", version="radioactive-decay-sim 0.1.1")
-    sub = p.add_subparsers(dest="cmd", required=True)
-
-    # simulate (single-isotope)
-    ps = sub.add_parser("simulate", help="Run a single-isotope simulation")
+def _add_simulate_args(ps) -> None:
     ps.add_argument("--mode", choices=["deterministic", "mc"], default="mc")
     ps.add_argument("--isotope", choices=sorted(PRESETS.keys()))
     ps.add_argument("--half-life", type=float, dest="half_life")
     ps.add_argument("--half-life-unit", choices=list(UNIT_SEC.keys()), default="h")
     ps.add_argument("--lambda", type=float, dest="lambda_")
     ps.add_argument("--n0", type=int, default=10000)
-    ps.add_argument("--tmax", type=float, default=10.0)
+    ps.add_argument("--tmax", type=float, help="Simulated time span (default 10; with --extend: the run's)")
     ps.add_argument("--dt", type=float, default=0.05)
     ps.add_argument("--seed", type=int)
+    ps.add_argument("--realizations", type=int, default=20)
+    ps.add_argument("--engine", choices=["binomial", "per_nucleus", "numba", "exact", "adaptive"], default="binomial")
+    ps.add_argument("--tol", type=float, default=1.0,
+                    help="Adaptive engine: max std (nuclei) of output points between its binomial jumps")
+    ps.add_argument("--workers", type=int, default=1, help="Processes to shard realizations over")
+    ps.add_argument("--store", choices=["npy", "npz", "chunked"], default="npy",
+                    help="Run format: per-array .npy, one compressed .npz, or chunked blocks written while simulating")
+    ps.add_argument("--csv", action="store_true", help="Also export CSV copies of the arrays")
+    ps.add_argument("--encoding", choices=["tail", "delta"],
+                    help="Compact traj encoding (npy/npz): drop the all-zero tail, or store decays per step")
+    ps.add_argument("--no-save", dest="save", action="store_false", help="Keep results in memory only")
+    ps.add_argument("--no-cache", dest="cache", action="store_false",
+                    help="Always simulate, even if an identical seeded run is cached")
+    ps.add_argument("--t-eval", type=float, nargs="+",
+                    help="Output times, any grid (deterministic mode, exact and adaptive engines)")
+
+
+def _simulate(args):
+    """Run the simulation in this process; returns (t, N_mean, run_dir)."""
+    from . import simulate
+    from .runreader import load_array
+
+    if getattr(args, "extend", None):
+        from .resume import extend_run
+        t, traj, run_dir = extend_run(args.extend, tmax=args.tmax, add_realizations=args.add_realizations)
+        return t, traj.mean(axis=0), run_dir
+
+    if args.tmax is None:
+        args.tmax = 10.0
+    lam = _resolve_lambda(args)
+    # units & sanity hints (half-life in the same unit as lambda: args.half_life_unit)
+    T_half = math.log(2) / lam
+    # the exact/adaptive engines and deterministic mode pick their own steps; dt is only the output grid
+    if args.dt > (T_half / 10.0) and args.mode == "mc" and args.engine not in ("exact", "adaptive"):
+        print(f"[warn] dt={args.dt} is large vs T1/2≈{T_half:.3g} {args.half_life_unit}; consider dt <= T1/2/10.", file=sys.stderr)
+    if args.tmax < (2.0 * T_half):
+        print(f"[warn] tmax={args.tmax} may be short (< 2·T1/2≈{2*T_half:.3g} {args.half_life_unit}); decay may be truncated.", file=sys.stderr)
+
+    t, traj, run_dir = simulate.run(
+        lam, n0=args.n0, tmax=args.tmax, dt=args.dt, seed=args.seed, realizations=args.realizations,
+        engine=args.engine, workers=args.workers, mode=args.mode, meta={"unit": args.half_life_unit},
+        store=args.store, csv=args.csv, save=args.save, cache=args.cache, t_eval=args.t_eval,
+        tol=args.tol, encoding=args.encoding,
+    )
+    N = load_array(run_dir, "N") if traj is None else traj.mean(axis=0)
+    return t, N, run_dir
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Run radioactive-decay simulations and plots")
+    p.add_argument("-V", "--version", action="version", version="radioactive-decay-sim 0.1.1")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    # instrumentation flags, accepted by every subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--timings", action="store_true",
+                        help="Print per-phase timers and counters and append them to the run's meta.json")
+    common.add_argument("--profile", nargs="?", const="cprofile", choices=["cprofile", "pyinstrument"],
+                        help="Profile the command (implies --timings); output under data/profile/")
+
+    # simulate (single-isotope)
+    ps = sub.add_parser("simulate", help="Run a single-isotope simulation", parents=[common])
+    _add_simulate_args(ps)
     ps.add_argument("--plot", action="store_true")
+    ps.add_argument("--extend", metavar="RUN_DIR",
+                    help="Continue a saved binomial run to --tmax and/or by --add-realizations (new run dir)")
+    ps.add_argument("--add-realizations", type=int, default=0, help="With --extend: realizations to append")
+
+    # pipeline: simulate -> analyze -> plot in one process
+    pl = sub.add_parser("pipeline", help="Simulate, analyze and plot in one go", parents=[common])
+    _add_simulate_args(pl)
+    pl.add_argument("--out", default="images")
+    pl.add_argument("--method", choices=["mle", "loglinear"], default="mle", help="λ fit (see analyze)")
 
     # plot
-    pp = sub.add_parser("plot", help="Plot a saved run")
-    pp.add_argument("--run-dir", default="data/runs/last")
+    pp = sub.add_parser("plot", help="Plot a saved run", parents=[common])
+    pp.add_argument("--run-dir", nargs="+", default=["data/runs/last"],
+                    help="One run, or many (each rendered into <out>/<run name>/)")
     pp.add_argument("--out", default="images")
+    pp.add_argument("--workers", type=int, default=1, help="Processes rendering many runs in parallel")
+    pp.add_argument("--dpi", type=int, default=200)
 
     # analyze
-    pa = sub.add_parser("analyze", help="Estimate λ and half-life from a saved run")
+    pa = sub.add_parser("analyze", help="Estimate λ and half-life from a saved run", parents=[common])
     pa.add_argument("--run-dir", default="data/runs/last")
     pa.add_argument("--out", default="images")
+    pa.add_argument("--method", choices=["mle", "loglinear"], default="mle",
+                    help="Binomial maximum likelihood with standard errors (default) or unweighted log-linear fit")
+    pa.add_argument("--per-realization", action="store_true",
+                    help="Also fit every realization and bootstrap a CI for T1/2 (needs traj)")
+    pa.add_argument("--n-boot", type=int, default=1000, help="Bootstrap replicates for --per-realization")
 
     # bg (background)
-    pb = sub.add_parser("bg", help="Add Poisson background to a saved run and plot")
+    pb = sub.add_parser("bg", help="Add Poisson background to a saved run and plot", parents=[common])
     pb.add_argument("--run-dir", default="data/runs/last")
-    pb.add_argument("--bg-rate", type=float, required=True)
+    pb.add_argument("--bg-rate", type=float, required=True, help="Background counts per bin (per dt)")
+    pb.add_argument("--efficiency", type=float, default=1.0, help="Detection probability per decay")
+    pb.add_argument("--dead-time", type=float, default=0.0, help="Non-paralyzable dead time (time unit of the run)")
     pb.add_argument("--seed", type=int, default=0)
     pb.add_argument("--out", default="images")
 
-    # chain (A → B)
-    pc = sub.add_parser("chain", help="Simulate A→B decay chain")
+    # cache (result cache over data/runs)
+    pk = sub.add_parser("cache", help="List or evict cached runs in data/runs (LRU; uncached runs are kept)",
+                        parents=[common])
+    pk.add_argument("action", choices=["list", "evict", "clear"])
+    pk.add_argument("--max-runs", type=int)
+    pk.add_argument("--max-mb", type=float)
+
+    # batch (YAML experiments)
+    pj = sub.add_parser("batch", help="Run experiment YAML files (grids, dedup, worker pool) with one summary",
+                        parents=[common])
+    pj.add_argument("configs", nargs="+", help="Experiment files, e.g. config/default.yaml")
+    pj.add_argument("--workers", type=int, default=1, help="Processes running jobs in parallel")
+    pj.add_argument("--dry-run", action="store_true", help="Only list the expanded, deduplicated jobs")
+    pj.add_argument("--out", help="Summary CSV (default: <output_dir>/batch/summary_<time>.csv)")
+
+    # bench (timings against a stored baseline)
+    pn = sub.add_parser("bench", help="Benchmark engines, mixtures, chains and fits; compare with a baseline",
+                        parents=[common])
+    pn.add_argument("--grid", choices=["quick", "full"], default="quick")
+    pn.add_argument("--warmup", type=int, default=1, help="Untimed-for-steady-state calls per case (JIT, caches)")
+    pn.add_argument("--repeat", type=int, default=5, help="Steady-state calls per case")
+    pn.add_argument("--select", help="Only cases whose name contains this string")
+    pn.add_argument("--out", default="data/bench/latest.json", help="JSON report")
+    pn.add_argument("--baseline", help="Baseline JSON (default: benchmarks/baseline.json)")
+    pn.add_argument("--tolerance", type=float, default=0.3, help="Allowed slowdown vs baseline (fraction)")
+    pn.add_argument("--save-baseline", action="store_true", help="Write this report as the new baseline")
+
+    # live (streaming acquisition with an online λ estimate)
+    pv = sub.add_parser("live", help="Stream counts per bin into a recursive λ/T½ estimate", parents=[common])
+    pvs = pv.add_mutually_exclusive_group(required=True)
+    pvs.add_argument("--replay", metavar="PATH", help="Run dir (measured.npy, traj or N) or CSV of t,count")
+    pvs.add_argument("--lambda", type=float, dest="lambda_", help="Simulate a source with this λ")
+    pv.add_argument("--n0", type=int, default=10000)
+    pv.add_argument("--dt", type=float, default=0.1, help="Bin width (simulated source)")
+    pv.add_argument("--tmax", type=float, help="Stop after this time (simulated source)")
+    pv.add_argument("--efficiency", type=float, default=1.0)
+    pv.add_argument("--dead-time", type=float, default=0.0)
+    pv.add_argument("--bg-rate", type=float, default=0.0, help="Known background counts per bin")
+    pv.add_argument("--seed", type=int)
+    pv.add_argument("--interval", type=float, default=0.0, help="Wall-clock seconds between bins (0: no pacing)")
+    pv.add_argument("--every", type=int, default=1, help="Publish an estimate every K bins")
+    pv.add_argument("--out", help="Also append every estimate as a JSON line to this file")
+
+    # mixture (multi-isotope source, multinomial over time bins)
+    pm = sub.add_parser("mixture", help="Simulate a multi-isotope source (any N0, cost independent of N0)",
+                        parents=[common])
+    pm.add_argument("--isotope", nargs="+", required=True, choices=sorted(PRESETS.keys()))
+    pm.add_argument("--n0", type=float, nargs="+", required=True, help="Initial nuclei, one per isotope or one for all")
+    pm.add_argument("--unit", choices=list(UNIT_SEC.keys()), default="h", help="Time unit of --tmax/--dt")
+    pm.add_argument("--tmax", type=float, default=10.0)
+    pm.add_argument("--dt", type=float, default=0.05)
+    pm.add_argument("--realizations", type=int, default=20)
+    pm.add_argument("--seed", type=int)
+    pm.add_argument("--plot", action="store_true")
+
+    # chain (A → B, or longer / branching)
+    pc = sub.add_parser("chain", help="Simulate A→B (or longer/branching) decay chain", parents=[common])
     pc.add_argument("--mode", choices=["deterministic", "mc"], default="mc")
+    pc.add_argument("--preset", choices=["mo99-tc99m"], help="Named chain from the nuclide catalogue")
+    pc.add_argument("--unit", default="h", choices=sorted(UNIT_SEC), help="Time unit of a preset chain")
     pc.add_argument("--n0a", type=int, required=True, help="Initial nuclei of A")
-    pc.add_argument("--lambda-a", type=float, required=True)
-    pc.add_argument("--lambda-b", type=float, required=True)
+    pc.add_argument("--lambda-a", type=float)
+    pc.add_argument("--lambda-b", type=float)
+    pc.add_argument("--lambdas", type=float, nargs="+", help="Linear chain of any length")
     pc.add_argument("--tmax", type=float, default=10.0)
     pc.add_argument("--dt", type=float, default=0.05)
     pc.add_argument("--realizations", type=int, default=30, help="MC only")
@@ -100,70 +204,140 @@ def main() -> None:
     pc.add_argument("--out", default="images")
 
     args = p.parse_args()
+    if getattr(args, "encoding", None) and args.store == "chunked":
+        {"simulate": ps, "pipeline": pl}[args.cmd].error("--encoding needs --store npy or npz (not chunked)")
+    if not (args.timings or args.profile):
+        _run(args)
+        return
+
+    from . import instrument
+    instrument.enable()
+    with instrument.profile(args.profile, f"data/profile/{args.cmd}"):
+        run_dir = _run(args)
+    instrument.report(run_dir, command=args.cmd)
 
-    if args.cmd == "simulate":
-        lam = _resolve_lambda(args)
-        cmd = [
-            sys.executable, "-m", "src.simulate",
-            "--mode", args.mode,
-            "--n0", str(args.n0),
-            "--lambda", str(lam),
-            "--tmax", str(args.tmax),
-            "--dt", str(args.dt),
-        ]
-        if args.seed is not None:
-            cmd += ["--seed", str(args.seed)]
-        _run(cmd)
-
-        # units & sanity hints
-        try:
-            # compute half-life from lambda we just resolved
-            T_half = math.log(2) / lam  # unit: args.half_life_unit
-            if args.dt > (T_half / 10.0):
-                print(f"[warn] dt={args.dt} is large vs T1/2≈{T_half:.3g} {args.half_life_unit}; consider dt <= T1/2/10.", file=sys.stderr)
-            if args.tmax < (2.0 * T_half):
-                print(f"[warn] tmax={args.tmax} may be short (< 2·T1/2≈{2*T_half:.3g} {args.half_life_unit}); decay may be truncated.", file=sys.stderr)
-            # record unit in latest run's meta.json
-            meta_path = os.path.join("data","runs","last","meta.json")
-            if os.path.exists(meta_path):
-                with open(meta_path, "r", encoding="utf-8") as f:
-                    meta = json.load(f)
-                meta["unit"] = args.half_life_unit
-                with open(meta_path, "w", encoding="utf-8") as f:
-                    json.dump(meta, f, indent=2)
-                print(f"[info] Recorded unit={args.half_life_unit} in {meta_path}", file=sys.stderr)
-        except Exception as e:
-            print(f"[warn] unit/meta post-process failed: {e}", file=sys.stderr)
 
+def _run(args):
+    """Execute one subcommand; returns the run directory it worked on (or None)."""
+    if args.cmd == "simulate":
+        t, N, run_dir = _simulate(args)
         if args.plot:
-            _run([sys.executable, "-m", "src.plotting", "--run-dir", "data/runs/last", "--out", "images"])
-        return
+            from .plotting import plot_run
+            plot_run(t, N, "images")
+        return run_dir
+
+    if args.cmd == "pipeline":
+        from .analyze import analyze
+        from .plotting import plot_run
+        t, N, run_dir = _simulate(args)
+        exact = args.mode == "deterministic"
+        analyze(t, N, run_dir, args.out, 1 if exact else args.realizations, args.method, exact=exact)
+        plot_run(t, N, args.out)
+        return run_dir
 
     if args.cmd == "plot":
-        _run([sys.executable, "-m", "src.plotting", "--run-dir", args.run_dir, "--out", args.out])
-        return
+        if len(args.run_dir) > 1:
+            from .plotting import render_runs
+            paths = render_runs(args.run_dir, args.out, args.workers, args.dpi)
+            print(f"[OK] Rendered {len(paths)} run(s) into {args.out}/<run>/")
+            return None
+        from .plotting import plot_run
+        from .runreader import RunReader
+        run = RunReader(args.run_dir[0])
+        ci = run.mean_and_ci()[1] if run.has("traj") else None
+        plot_run(run.t, run.mean(), args.out, ci=ci)
+        return args.run_dir[0]
 
     if args.cmd == "analyze":
-        _run([sys.executable, "-m", "src.analyze", "--run-dir", args.run_dir, "--out", args.out])
-        return
+        from .analyze import analyze
+        from .runreader import load_series
+        t, N, meta = load_series(args.run_dir)
+        analyze(t, N, args.run_dir, args.out, meta.get("n_realizations", 1), args.method,
+                exact=meta.get("mode") == "deterministic")
+        if args.per_realization:
+            from .analyze import analyze_realizations
+            analyze_realizations(args.run_dir, args.n_boot)
+        return args.run_dir
 
     if args.cmd == "bg":
-        _run([sys.executable, "src/plot_with_bg.py",
-              "--run-dir", args.run_dir, "--bg-rate", str(args.bg_rate),
-              "--seed", str(args.seed), "--out", args.out])
+        from .detector import DetectorModel
+        from .plot_with_bg import add_background, measure_run
+        from .runreader import load_series
+        t, N, meta = load_series(args.run_dir)
+        add_background(t, N, args.bg_rate, args.seed, args.out, meta)
+        measure_run(args.run_dir, DetectorModel(args.efficiency, args.dead_time, args.bg_rate), args.seed, args.out)
+        return args.run_dir
+
+    if args.cmd == "cache":
+        from . import cache
+        if args.action == "list":
+            for d, used, size in cache.list_runs():
+                print(f"{d.name}\t{size / 2**20:8.2f} MB\tlast used {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used))}")
+            return
+        if args.action == "clear":
+            removed = cache.evict(max_runs=0)
+        else:
+            max_bytes = None if args.max_mb is None else int(args.max_mb * 2**20)
+            if args.max_runs is None and max_bytes is None:
+                raise SystemExit("evict needs --max-runs and/or --max-mb")
+            removed = cache.evict(args.max_runs, max_bytes)
+        print(f"[OK] Evicted {len(removed)} run(s)")
         return
 
+    if args.cmd == "batch":
+        from .batch import run_batch
+        run_batch(args.configs, args.workers, args.dry_run, args.out)
+        return
+
+    if args.cmd == "bench":
+        from pathlib import Path
+        from . import bench
+        report = bench.run_bench(args.grid, args.warmup, args.repeat, args.select)
+        print(f"[OK] Wrote {bench.write_json(report, args.out)}")
+        baseline = Path(args.baseline) if args.baseline else bench.BASELINE
+        if args.save_baseline:
+            print(f"[OK] Saved baseline {bench.write_json(report, baseline)}")
+            return
+        if not baseline.exists():
+            print(f"[warn] No baseline at {baseline}; run with --save-baseline to create one.", file=sys.stderr)
+            return
+        slow = bench.compare(report, bench.load_json(baseline), args.tolerance)
+        for name, b, c in slow:
+            print(f"[regression] {name}: {b * 1e3:.2f} ms -> {c * 1e3:.2f} ms", file=sys.stderr)
+        if slow:
+            raise SystemExit(f"{len(slow)} case(s) slower than baseline by more than {args.tolerance:.0%}")
+        print(f"[OK] No regressions vs {baseline}")
+        return
+
+    if args.cmd == "live":
+        import asyncio
+        from .detector import DetectorModel
+        from .live import run_live
+        det = DetectorModel(args.efficiency, args.dead_time, args.bg_rate)
+        asyncio.run(run_live(det, args.replay, args.lambda_, args.n0, args.dt, args.tmax, args.seed,
+                             args.interval, args.every, args.out))
+        return
+
+    if args.cmd == "mixture":
+        from .decay import Isotope
+        from .simulate import run_mixture
+        if len(args.n0) not in (1, len(args.isotope)):
+            raise SystemExit("--n0 takes one value per isotope, or a single value for all")
+        n0 = args.n0 * len(args.isotope) if len(args.n0) == 1 else args.n0
+        isotopes = []
+        for key, n in zip(args.isotope, n0):
+            isotopes.append(Isotope(key, N0=int(n), lam=preset_lambda(key, args.unit)))
+        t, res, run_dir = run_mixture(isotopes, args.tmax, args.dt, args.realizations, args.seed,
+                                      meta={"unit": args.unit})
+        if args.plot:
+            from .plotting import plot_run
+            plot_run(t, res.total().mean(axis=0), "images")
+        return run_dir
+
     if args.cmd == "chain":
-        _run([sys.executable, "-m", "src.chain",
-              "--mode", args.mode,
-              "--n0a", str(args.n0a),
-              "--lambda-a", str(args.lambda_a),
-              "--lambda-b", str(args.lambda_b),
-              "--tmax", str(args.tmax),
-              "--dt", str(args.dt),
-              "--realizations", str(args.realizations),
-              "--seed", str(args.seed),
-              "--out", args.out])
+        from .chain import resolve_chain, run_chain
+        chain = resolve_chain(args.preset, args.lambdas, args.lambda_a, args.lambda_b, args.unit)
+        run_chain(chain, args.n0a, args.tmax, args.dt, args.mode, args.realizations, args.seed, args.out)
         return
 
 
@@ -21,7 +21,31 @@ class Isotope:
         return self.lam * self.N_analytical(t)
 
 
+def decay_table(N0, lam, t):
+    """
+    Analytical N(t) and A(t) for many isotopes on any time grid at once.
+
+    Parameters
+    ----------
+    N0, lam : float or array_like
+        Initial nuclei and decay constants, scalars or shape (n_isotopes,).
+    t : float or array_like
+        Time points (any grid, need not be uniform or sorted).
+
+    Returns
+    -------
+    N, A : np.ndarray
+        Shape (n_isotopes, len(t)), or (len(t),) for scalar N0 and lam;
+        a scalar t drops the time axis. One broadcast exp over the whole table.
+    """
+    t = np.asarray(t, dtype=float)
+    axis = (...,) + (None,) * t.ndim
+    lam = np.asarray(lam, dtype=float)[axis]
+    N = np.asarray(N0, dtype=float)[axis] * np.exp(-lam * t)
+    return N, lam * N
+
+
 def mixture_counts_analytical(isotopes, t):
-    N = sum(iso.N_analytical(t) for iso in isotopes)
-    A = sum(iso.activity(t) for iso in isotopes)
-    return N, A
+    """Total N(t) and A(t) of a source of several isotopes (MC: simulate.simulate_mixture)."""
+    N, A = decay_table([iso.N0 for iso in isotopes], [iso.lam for iso in isotopes], t)
+    return N.sum(axis=0), A.sum(axis=0)
@@ -0,0 +1,122 @@
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+# Opt-in instrumentation: per-phase wall-clock timers and counters (RNG calls,
+# bytes written, figures) for the simulate/save/analyze/plot hot paths.
+#
+# Disabled by default. When disabled, phase() returns a shared no-op context
+# and count() is a single flag test, and both sit at phase granularity (never
+# inside per-step loops), so the cost is a few attribute lookups per run.
+
+_enabled = False
+_timers = {}
+_counters = {}
+_NULL = nullcontext()
+
+
+def enable(on: bool = True) -> None:
+    global _enabled
+    _enabled = on
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    _timers.clear()
+    _counters.clear()
+
+
+class _Phase:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _timers[self.name] = _timers.get(self.name, 0.0) + time.perf_counter() - self.t0
+        return False
+
+
+def phase(name: str):
+    """Context manager adding the elapsed wall time to timer `name` (no-op when disabled)."""
+    return _Phase(name) if _enabled else _NULL
+
+
+def count(name: str, n=1) -> None:
+    """Add n to counter `name` (no-op when disabled)."""
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + int(n)
+
+
+def snapshot() -> dict:
+    """{"timers_s": {...}, "counters": {...}} accumulated since the last reset."""
+    return {"timers_s": {k: round(v, 6) for k, v in sorted(_timers.items())}, "counters": dict(sorted(_counters.items()))}
+
+
+def report(run_dir=None, command=None, stream=sys.stderr) -> dict:
+    """
+    Print the timers/counters and append them as one record to the
+    "timing" list of <run_dir>/meta.json (when run_dir has one).
+    """
+    rec = {"command": command, "date": time.strftime("%Y-%m-%dT%H:%M:%S"), **snapshot()}
+    for name, sec in rec["timers_s"].items():
+        print(f"[timing] {name:<24} {sec * 1e3:10.2f} ms", file=stream)
+    for name, n in rec["counters"].items():
+        print(f"[count]  {name:<24} {n:>12,}", file=stream)
+    if run_dir is not None:
+        path = Path(run_dir) / "meta.json"
+        if path.exists():
+            meta = json.loads(path.read_text())
+            meta.setdefault("timing", []).append(rec)
+            path.write_text(json.dumps(meta, indent=2))
+    return rec
+
+
+@contextmanager
+def profile(tool=None, out_stem="data/profile/run"):
+    """
+    Capture a profile of the enclosed block with tool "cprofile" (stats file
+    <out_stem>.prof plus the top entries on stderr) or "pyinstrument"
+    (<out_stem>.html; needs the optional pyinstrument package). tool=None
+    does nothing.
+    """
+    if tool is None:
+        yield None
+        return
+    out = Path(f"{out_stem}-{time.strftime('%Y%m%d-%H%M%S')}")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    if tool == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise SystemExit("pyinstrument is not installed; use --profile cprofile or pip install pyinstrument")
+        prof = Profiler()
+        prof.start()
+        try:
+            yield prof
+        finally:
+            prof.stop()
+            path = out.with_suffix(".html")
+            path.write_text(prof.output_html())
+            print(f"[OK] Saved profile to {path}", file=sys.stderr)
+        return
+    import cProfile
+    import pstats
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield prof
+    finally:
+        prof.disable()
+        path = out.with_suffix(".prof")
+        prof.dump_stats(path)
+        pstats.Stats(prof, stream=sys.stderr).sort_stats("cumulative").print_stats(15)
+        print(f"[OK] Saved profile to {path} (view with python -m pstats or snakeviz)", file=sys.stderr)
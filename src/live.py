@@ -0,0 +1,243 @@
+import asyncio
+import contextlib
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+import numpy as np
+from .detector import DetectorModel
+# Live acquisition: counts per bin arrive one at a time (a simulated source
+# seen through the bg detector model, or a replayed file) and λ̂ / T½ are
+# updated recursively with O(1) work per bin.
+#
+# For recorded means a·q^k in bins k = 0, 1, ... of width Δ (q = e^{-λΔ}) the
+# Poisson likelihood depends on the counts only through n, S0 = Σ y_k and
+# S1 = Σ k·y_k, so the estimate after every bin is the same MLE that
+# analysis.fit_lambda_poisson gives on all bins so far. Known dead time and
+# background are undone per bin before the update.
+
+
+@dataclass
+class Estimate:
+    """One point of the estimate stream (t is the end of the latest bin)."""
+    t: float
+    n_bins: int
+    counts: float             # total counts so far, after dead-time/background correction
+    lam: float
+    lam_se: float
+    half_life: float
+    half_life_se: float
+    N0: float
+    latency: float = 0.0      # seconds from the bin's arrival to this estimate
+
+
+def _geometric(lam, dt, n):
+    """Mean and variance of the bin index k under weights q^k, k < n (truncated geometric)."""
+    x = lam * dt
+    one_minus_q = -np.expm1(-x)
+    q = 1.0 - one_minus_q
+    qn = np.exp(-x * n)
+    one_minus_qn = -np.expm1(-x * n)
+    mean = q / one_minus_q - n * qn / one_minus_qn
+    var = q / one_minus_q**2 - n * n * qn / one_minus_qn**2
+    return mean, var
+
+
+class OnlineDecayFit:
+    """
+    Recursive Poisson MLE of λ (and N0) from counts per uniform bin.
+
+    update(count) folds one bin into the sufficient statistics and refines
+    λ̂ with a few Newton steps warm-started from the previous estimate, so
+    each bin costs O(1) however long the acquisition runs. Estimates are
+    NaN until the counts show a decay (at least two bins, mean bin index
+    below the flat-curve value).
+    """
+
+    max_newton = 8
+
+    def __init__(self, dt: float, t0: float = 0.0, det: DetectorModel = None, tol: float = 1e-10):
+        self.dt = float(dt)
+        self.t0 = float(t0)
+        self.det = DetectorModel() if det is None else det
+        self.tol = tol
+        self.n = 0
+        self.s0 = 0.0
+        self.s1 = 0.0
+        self.lam = np.nan
+
+    def _corrected(self, count):
+        y = float(count)
+        if self.det.dead_time:
+            y = y / max(1.0 - y * self.det.dead_time / self.dt, 1e-3)
+        return y - self.det.bg_rate
+
+    def update(self, count) -> Estimate:
+        y = self._corrected(count)
+        self.s0 += y
+        self.s1 += self.n * y
+        self.n += 1
+        return self.estimate()
+
+    def estimate(self) -> Estimate:
+        n, dt = self.n, self.dt
+        t = self.t0 + n * dt
+        kbar = self.s1 / self.s0 if self.s0 > 0 else np.nan
+        if n < 2 or not kbar < (n - 1) / 2:
+            self.lam = np.nan
+            return Estimate(t, n, self.s0, np.nan, np.nan, np.nan, np.nan, np.nan)
+        lam = self.lam
+        if not np.isfinite(lam):
+            lam = np.log1p(1.0 / max(kbar, 1e-12)) / dt      # untruncated geometric start
+        for _ in range(self.max_newton):
+            mean, var = _geometric(lam, dt, n)
+            if not var > 0:
+                break
+            step = (mean - kbar) / (dt * var)
+            lam = max(lam + step, lam / 10)
+            if abs(step) <= self.tol * lam:
+                break
+        self.lam = lam
+        _, var = _geometric(lam, dt, n)
+        se = 1.0 / (dt * np.sqrt(self.s0 * var))
+        # recorded counts in bin 0 are a = ε N0 e^{-λ t0} (1 - e^{-λΔ})
+        a = self.s0 * -np.expm1(-lam * dt) / -np.expm1(-lam * dt * n)
+        N0 = a / (self.det.efficiency * -np.expm1(-lam * dt)) * np.exp(lam * self.t0)
+        hl = np.log(2) / lam
+        return Estimate(t, n, self.s0, lam, se, hl, np.log(2) * se / lam**2, N0)
+
+
+# --- count sources: iterables of (bin start time, recorded count) ---
+
+def simulated_counts(N0: int, lam: float, dt: float, det: DetectorModel = None, rng=None, tmax=None):
+    """
+    Counts per bin from a decaying source, generated bin by bin.
+
+    Each bin is one binomial decay draw followed by det.measure (efficiency,
+    background, dead time). Runs until tmax; with tmax None, until the
+    source is empty (or forever when there is background to record).
+    """
+    det = DetectorModel() if det is None else det
+    rng = np.random.default_rng(rng)
+    p = -np.expm1(-lam * dt)
+    N, k = int(N0), 0
+    while (tmax is None and (N > 0 or det.bg_rate)) or (tmax is not None and (k + 1) * dt <= tmax + 1e-12):
+        nxt = N - int(rng.binomial(N, p))
+        tk = k * dt
+        yield tk, int(det.measure(np.array([tk, tk + dt]), np.array([N, nxt]), rng)[0])
+        N, k = nxt, k + 1
+
+
+def replayed_counts(path, series: int = 0):
+    """
+    Counts per bin read back from disk.
+
+    path is a run directory (measured.npy from `bg` if present, else the
+    decays of traj row `series`, else of the rounded mean N) or a CSV file
+    with columns t,count.
+    """
+    path = Path(path)
+    if path.is_dir():
+        from .runreader import RunReader
+        run = RunReader(path)
+        t = run.t
+        if run.has("measured"):
+            counts = np.asarray(run.array("measured"))[series]
+        elif run.has("traj"):
+            counts = -np.diff(np.asarray(run.array("traj")[series], dtype=np.int64))
+        else:
+            counts = -np.diff(np.rint(run.mean()).astype(np.int64))
+        t = t[:-1]
+    else:
+        data = np.loadtxt(path, delimiter=",", ndmin=2, comments="#")
+        t, counts = data[:, 0], data[:, 1]
+    yield from zip(t.tolist(), np.asarray(counts).tolist())
+
+
+async def acquire(source, interval: float = 0.0):
+    """Async iterator over a count source, one bin every `interval` seconds (0: as fast as possible)."""
+    for tk, count in source:
+        yield tk, count
+        await asyncio.sleep(interval)
+
+
+async def live_estimates(counts, dt: float, t0: float = 0.0, det: DetectorModel = None, every: int = 1):
+    """
+    Async stream of Estimates from an async iterator of (t, count).
+
+    A producer task folds every bin into an OnlineDecayFit as soon as it
+    arrives; the consumer always gets the newest estimate (older ones not yet
+    picked up are dropped), so a slow consumer never falls behind the
+    acquisition: each yielded estimate is at most one bin old, and its
+    latency field says how long ago that bin arrived. every=k publishes only
+    every k-th bin; the final estimate is always delivered.
+    """
+    fit = OnlineDecayFit(dt, t0, det)
+    latest = asyncio.Queue(maxsize=1)
+    done = object()
+
+    async def _produce():
+        try:
+            async for _, count in counts:
+                arrived = time.perf_counter()
+                est = fit.update(count)
+                if fit.n % every == 0:
+                    _publish(latest, (arrived, est))
+            if fit.n % every:
+                _publish(latest, (arrived, est))
+        except Exception as exc:
+            await latest.put((None, exc))
+            return
+        await latest.put((None, done))
+
+    task = asyncio.create_task(_produce())
+    try:
+        while True:
+            arrived, est = await latest.get()
+            if est is done:
+                break
+            if isinstance(est, Exception):
+                raise est
+            est.latency = time.perf_counter() - arrived
+            yield est
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def _publish(queue: asyncio.Queue, item):
+    if queue.full():
+        queue.get_nowait()       # drop the stale estimate
+    queue.put_nowait(item)
+
+
+def as_record(est: Estimate) -> dict:
+    return {k: (None if isinstance(v, float) and not np.isfinite(v) else v) for k, v in asdict(est).items()}
+
+
+async def run_live(det: DetectorModel, replay=None, lam=None, n0=10000, dt=0.1, tmax=None, seed=None,
+                   interval=0.0, every=1, out=None):
+    """Drive live_estimates from a replayed file or a simulated source, printing each estimate."""
+    import json
+    if replay is not None:
+        bins = list(replayed_counts(replay))
+        if len(bins) < 2:
+            raise SystemExit(f"{replay} has fewer than two bins")
+        t0, dt = bins[0][0], bins[1][0] - bins[0][0]
+        source = bins
+    else:
+        t0, source = 0.0, simulated_counts(n0, lam, dt, det, seed, tmax)
+    f = open(out, "a") if out else None
+    last = None
+    try:
+        async for est in live_estimates(acquire(source, interval), dt, t0, det, every):
+            last = est
+            print(f"[live] t={est.t:.6g} bins={est.n_bins} λ̂={est.lam:.6g} ± {est.lam_se:.2g} "
+                  f"T½={est.half_life:.6g} ± {est.half_life_se:.2g} ({est.latency * 1e3:.2f} ms)")
+            if f:
+                f.write(json.dumps(as_record(est)) + "\n")
+                f.flush()
+    finally:
+        if f:
+            f.close()
+    return last
@@ -1,57 +1,108 @@
-import argparse, os, json
+import argparse, os, json, sys
 import numpy as np
-import matplotlib.pyplot as plt
-
-def load_series(run_dir: str):
-    t = np.load(os.path.join(run_dir, "t.npy"))
-    series = None
-    for cand in ("N.npy", "counts.npy"):
-        p = os.path.join(run_dir, cand)
-        if os.path.exists(p):
-            series = np.load(p).astype(float)
-            break
-    if series is None:
-        p = os.path.join(run_dir, "traj.npy")
-        if os.path.exists(p):
-            series = np.load(p).mean(axis=0).astype(float)
-        else:
-            raise SystemExit("No N.npy/counts.npy/traj.npy found in run dir.")
-    meta = {}
-    mpath = os.path.join(run_dir, "meta.json")
-    if os.path.exists(mpath):
-        with open(mpath) as f:
-            meta = json.load(f)
-    return t, series, meta
+from . import instrument
+from .detector import DetectorModel, fit_detector, uniform_grid
+from .runreader import RunReader, load_series
 
-def main():
-    ap = argparse.ArgumentParser(description="Add Poisson background to a saved run and plot")
-    ap.add_argument("--run-dir", default="data/runs/last")
-    ap.add_argument("--bg-rate", type=float, required=True, help="Background counts per time-bin (per dt).")
-    ap.add_argument("--seed", type=int, default=0)
-    ap.add_argument("--out", default="images")
-    args = ap.parse_args()
-
-    os.makedirs(args.out, exist_ok=True)
-    rng = np.random.default_rng(args.seed)
+def add_background(t, N, bg_rate, seed=0, out="images", meta=None):
+    """Add Poisson background (bg_rate per bin) to N(t), plot both; returns the measured series."""
+    from .plotting import _pyplot
+    plt = _pyplot()
+    os.makedirs(out, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    meta = meta or {}
 
-    t, N, meta = load_series(args.run_dir)
-    bg = rng.poisson(args.bg_rate, size=N.shape)
+    bg = rng.poisson(bg_rate, size=N.shape)
     meas = N + bg
 
     plt.figure(); plt.plot(t, N, label="N(t) (clean)")
-    plt.plot(t, meas, ".", label=f"with background (rate={args.bg_rate}/bin)")
+    plt.plot(t, meas, ".", label=f"with background (rate={bg_rate}/bin)")
     plt.xlabel("Time"); plt.ylabel("Counts")
     ttl = f"N(t) with background — {meta.get('mode','')}".strip(" -")
     plt.title(ttl); plt.legend(); plt.grid(True, alpha=0.3); plt.tight_layout()
-    p1 = os.path.join(args.out, "nt_curve_bg.png"); plt.savefig(p1, dpi=200)
+    p1 = os.path.join(out, "nt_curve_bg.png"); plt.savefig(p1, dpi=200); plt.close()
 
     mask = meas > 0
     plt.figure(); plt.plot(t[mask], np.log(meas[mask]), ".", label="log(measured)")
     plt.xlabel("Time"); plt.ylabel("ln Counts"); plt.title("Log counts with background")
     plt.grid(True, alpha=0.3); plt.tight_layout()
-    p2 = os.path.join(args.out, "log_nt_bg.png"); plt.savefig(p2, dpi=200)
+    p2 = os.path.join(out, "log_nt_bg.png"); plt.savefig(p2, dpi=200); plt.close()
 
     print(f"[OK] Saved {p1} and {p2}")
+    return meas
+
+def measure_run(run_dir, det: DetectorModel, seed=0, out="images"):
+    """
+    Detector stage: record every realization of a run through `det`, then fit
+    (N0, λ, bg) to all recorded series at once.
+
+    Recorded counts go to <run>/measured.npy and the fit summary to fit.json
+    under "detector"; the plot shows the mean recorded counts per bin with the
+    pooled fit. Runs without traj (stream runs) are measured as one series
+    from the rounded mean curve. Returns the summary dict, or None for runs
+    on a non-uniform grid (--t-eval), where the stage is skipped.
+    """
+    from .plotting import plot_measured_counts
+    from .runstore import count_dtype_for
+    run = RunReader(run_dir)
+    t = run.t
+    if not uniform_grid(t):
+        print(f"[warn] {run_dir}: time grid is not uniform; skipping the detector stage "
+              "(it needs bins of equal width).", file=sys.stderr)
+        return None
+    rng = np.random.default_rng(seed)
+    chunks = run.row_chunks() if run.has("traj") else [np.rint(run.mean())[None]]
+    with instrument.phase("detector.measure"):
+        counts = np.concatenate([det.measure(t, rows, rng) for rows in chunks])
+    np.save(os.path.join(run_dir, "measured.npy"), counts.astype(count_dtype_for(counts.max(initial=0))))
+
+    with instrument.phase("detector.fit"):
+        fit = fit_detector(t, counts, det)
+    ok = fit.converged & np.isfinite(fit.se[:, 1]) & (fit.se[:, 1] > 0)
+    if not ok.any():
+        raise SystemExit(f"{run_dir}: no series could be fitted (none of {counts.shape[0]} detector fits converged); "
+                         f"recorded counts are in measured.npy.")
+    w = 1.0 / fit.se[ok, 1]**2          # inverse-variance pooling of the per-series λ̂
+    lam = float((w * fit.lam[ok]).sum() / w.sum())
+    lam_se = float(1.0 / np.sqrt(w.sum()))
+    rep = {
+        "efficiency": det.efficiency, "dead_time": det.dead_time, "bg_rate": det.bg_rate, "seed": seed,
+        "n_series": int(counts.shape[0]), "n_converged": int(ok.sum()),
+        "lambda_hat": lam, "lambda_se": lam_se,
+        "half_life_hat": float(np.log(2) / lam), "half_life_se": float(np.log(2) * lam_se / lam**2),
+        "N0_hat": float(fit.N0[ok].mean()), "bg_hat": float(fit.bg[ok].mean()),
+        "lambda_std": float(fit.lam[ok].std(ddof=1)) if ok.sum() > 1 else float("nan"),
+    }
+    path = os.path.join(run_dir, "fit.json")
+    full = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            full = json.load(f)
+    full["detector"] = rep
+    with open(path, "w") as f:
+        json.dump(full, f, indent=2)
+
+    os.makedirs(out, exist_ok=True)
+    p = os.path.join(out, "measured_counts.png")
+    model = det.expected(t, rep["N0_hat"], lam, rep["bg_hat"])
+    plot_measured_counts(0.5 * (t[:-1] + t[1:]), counts.mean(axis=0), label="recorded (mean per bin)", path=p,
+                         model=model, model_label=f"fit: λ̂={lam:.4g}, bg={rep['bg_hat']:.3g}/bin")
+    print(f"[OK] λ̂={lam:.6f} ± {lam_se:.2g}, bg≈{rep['bg_hat']:.4g}/bin from {ok.sum()} series. Saved {p}")
+    return rep
+
+def main():
+    ap = argparse.ArgumentParser(description="Add Poisson background to a saved run and plot")
+    ap.add_argument("--run-dir", default="data/runs/last")
+    ap.add_argument("--bg-rate", type=float, required=True, help="Background counts per time-bin (per dt).")
+    ap.add_argument("--efficiency", type=float, default=1.0, help="Detection probability per decay")
+    ap.add_argument("--dead-time", type=float, default=0.0, help="Non-paralyzable dead time (time unit of the run)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="images")
+    args = ap.parse_args()
+
+    t, N, meta = load_series(args.run_dir)
+    add_background(t, N, args.bg_rate, args.seed, args.out, meta)
+    measure_run(args.run_dir, DetectorModel(args.efficiency, args.dead_time, args.bg_rate), args.seed, args.out)
 
 if __name__ == "__main__":
     main()
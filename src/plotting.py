@@ -4,12 +4,64 @@
 # Minimal plotting helpers for counts, log-counts, activity, and measured counts
 
 import numpy as np
-import matplotlib.pyplot as plt
+from . import instrument
+
+
+MAX_POINTS = 2000   # points per drawn line after min/max decimation
+
+
+def _pyplot(interactive=False):
+    # matplotlib is imported on first plot, not when the module is imported;
+    # files are rendered with the non-interactive Agg backend unless a window is wanted
+    import sys
+    if not interactive and "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def decimate(t, y, max_points=MAX_POINTS):
+    """
+    Min/max decimation for drawing: split the series into max_points/2
+    buckets and keep each bucket's minimum and maximum (in time order), so
+    spikes and the envelope survive while long trajectories draw quickly.
+    Returns (t, y) unchanged when already short enough.
+    """
+    t = np.asarray(t)
+    y = np.asarray(y)
+    n = y.size
+    if n <= max_points:
+        return t, y
+    buckets = max(1, max_points // 2)
+    size = -(-n // buckets)
+    padded = np.concatenate([y, np.full(buckets * size - n, y[-1])]).reshape(buckets, size)
+    base = np.arange(buckets) * size
+    idx = np.concatenate([base + padded.argmin(axis=1), base + padded.argmax(axis=1), [0, n - 1]])
+    idx = np.unique(np.minimum(idx, n - 1))
+    return t[idx], y[idx]
+
+
+def _envelope(t, lo, hi, max_points=MAX_POINTS):
+    """Band version of decimate: per-bucket min of lo and max of hi, at each bucket's first time."""
+    n = t.size
+    if n <= max_points:
+        return t, lo, hi
+    size = -(-n // max_points)
+    pad = max_points * size - n
+    lo_b = np.concatenate([lo, np.full(pad, lo[-1])]).reshape(max_points, size).min(axis=1)
+    hi_b = np.concatenate([hi, np.full(pad, hi[-1])]).reshape(max_points, size).max(axis=1)
+    idx = np.arange(max_points) * size
+    keep = idx < n
+    return (np.append(t[idx[keep]], t[-1]), np.append(lo_b[keep], lo[-1]), np.append(hi_b[keep], hi[-1]))
 
 
 def _save_show(path, show):
+    plt = _pyplot(show)
     if path:
-        plt.savefig(path, bbox_inches="tight", dpi=200)
+        with instrument.phase("plot.savefig"):
+            plt.savefig(path, bbox_inches="tight", dpi=200)
+        instrument.count("figures")
     if show:
         plt.show()
     plt.close()
@@ -19,6 +71,7 @@ def plot_counts(t, mean, ci=None, label=None, path=None, show=False):
     """
     Plot N(t) with an optional symmetric confidence band 'ci'.
     """
+    plt = _pyplot()
     plt.figure()
     plt.plot(t, mean, label=label)
     if ci is not None:
@@ -36,6 +89,7 @@ def plot_log_counts(t, mean, label=None, path=None, show=False):
     """
     Plot log N(t) vs time (only where N>0).
     """
+    plt = _pyplot()
     valid = mean > 0
     plt.figure()
     plt.plot(t[valid], np.log(mean[valid]), label=label)
@@ -50,6 +104,7 @@ def plot_activity(t, A, label=None, path=None, show=False):
     """
     Plot activity A(t) vs time.
     """
+    plt = _pyplot()
     plt.figure()
     plt.plot(t, A, label=label)
     plt.xlabel("time [s]")
@@ -59,12 +114,16 @@ def plot_activity(t, A, label=None, path=None, show=False):
     _save_show(path, show)
 
 
-def plot_measured_counts(t, counts, label=None, path=None, show=False):
+def plot_measured_counts(t, counts, label=None, path=None, show=False, model=None, model_label="fit"):
     """
-    Plot measured detector counts per time bin (e.g., Poisson-thinned decays).
+    Plot measured detector counts per time bin (e.g., Poisson-thinned decays),
+    optionally with the expected counts of a fitted model on top.
     """
+    plt = _pyplot()
     plt.figure()
     plt.step(t, counts, where="mid", label=label)
+    if model is not None:
+        plt.plot(t, model, label=model_label)
     plt.xlabel("time [s]")
     plt.ylabel("Measured counts per bin")
     if label:
@@ -72,3 +131,141 @@ def plot_measured_counts(t, counts, label=None, path=None, show=False):
     _save_show(path, show)
 
 
+class RunRenderer:
+    """
+    Reusable N(t) and log N(t) figures for rendering many runs.
+
+    The figures, axes and line artists are created once; render() only
+    swaps in new (decimated) line data, rescales and saves, which is much
+    cheaper than building a fresh figure per plot.
+    """
+
+    def __init__(self, dpi=200, max_points=MAX_POINTS):
+        plt = _pyplot()
+        self.dpi = dpi
+        self.max_points = max_points
+        self.fig_n, self.ax_n = plt.subplots()
+        self.line_n, = self.ax_n.plot([], [], label="MC mean")
+        self.band = None
+        self.ax_n.set_xlabel("time [s]")
+        self.ax_n.set_ylabel("N(t)")
+        self.ax_n.legend()
+        self.fig_log, self.ax_log = plt.subplots()
+        self.line_log, = self.ax_log.plot([], [], label="MC mean")
+        self.ax_log.set_xlabel("time [s]")
+        self.ax_log.set_ylabel("log N(t)")
+        self.ax_log.legend()
+        # fixed margins instead of bbox_inches="tight", which draws every figure twice
+        for fig in (self.fig_n, self.fig_log):
+            fig.subplots_adjust(left=0.14, right=0.97, bottom=0.11, top=0.97)
+
+    def render(self, t, mean, out, ci=None):
+        """Write out/nt_curve.png and out/log_nt.png for one run; returns both paths."""
+        import os
+        os.makedirs(out, exist_ok=True)
+        p1 = os.path.join(out, "nt_curve.png")
+        p2 = os.path.join(out, "log_nt.png")
+        t = np.asarray(t, dtype=float)
+        mean = np.asarray(mean, dtype=float)
+
+        self.line_n.set_data(*decimate(t, mean, self.max_points))
+        if self.band is not None:
+            self.band.remove()
+            self.band = None
+        self.ax_n.relim()
+        if ci is not None:
+            tb, lo, hi = _envelope(t, np.maximum(mean - ci, 0.0), mean + ci, self.max_points)
+            self.band = self.ax_n.fill_between(tb, lo, hi, alpha=0.2, color=self.line_n.get_color())
+            self.ax_n.update_datalim(np.column_stack([tb, hi]))
+        self.ax_n.autoscale_view()
+
+        valid = mean > 0
+        self.line_log.set_data(*decimate(t[valid], np.log(mean[valid]), self.max_points))
+        self.ax_log.relim()
+        self.ax_log.autoscale_view()
+
+        with instrument.phase("plot.savefig"):
+            self.fig_n.savefig(p1, dpi=self.dpi)
+            self.fig_log.savefig(p2, dpi=self.dpi)
+        instrument.count("figures", 2)
+        return p1, p2
+
+    def close(self):
+        plt = _pyplot()
+        plt.close(self.fig_n)
+        plt.close(self.fig_log)
+
+
+def plot_run(t, mean, out="images", ci=None, show=False):
+    """
+    Standard figures for one run: N(t) (with CI band if given) and log N(t).
+    """
+    import os
+    if show:
+        os.makedirs(out, exist_ok=True)
+        p1 = os.path.join(out, "nt_curve.png")
+        p2 = os.path.join(out, "log_nt.png")
+        plot_counts(t, mean, ci=ci, label="MC mean", path=p1, show=show)
+        plot_log_counts(t, mean, label="MC mean", path=p2, show=show)
+    else:
+        with instrument.phase("plot"):
+            r = RunRenderer()
+            p1, p2 = r.render(t, mean, out, ci)
+            r.close()
+    print(f"[OK] Saved {p1} and {p2}")
+    return p1, p2
+
+
+def _render_group(run_dirs, out, dpi, max_points):
+    from pathlib import Path
+    from .runreader import RunReader
+    r = RunRenderer(dpi, max_points)
+    paths = []
+    for d in run_dirs:
+        run = RunReader(d)
+        ci = run.mean_and_ci()[1] if run.has("traj") else None
+        paths.append(r.render(run.t, run.mean(), str(Path(out) / Path(d).resolve().name), ci))
+    r.close()
+    return paths
+
+
+def render_runs(run_dirs, out="images/runs", workers=1, dpi=100, max_points=MAX_POINTS):
+    """
+    Standard figures for many saved runs, into out/<run name>/.
+
+    Runs are split round-robin over `workers` processes; each process keeps
+    one RunRenderer and only updates its line data from run to run.
+    Returns the (nt_curve, log_nt) paths in the order of run_dirs.
+    """
+    run_dirs = [str(d) for d in run_dirs]
+    workers = max(1, min(workers, len(run_dirs)))
+    groups = [run_dirs[i::workers] for i in range(workers)]
+    with instrument.phase("plot"):
+        if workers == 1:
+            results = [_render_group(groups[0], out, dpi, max_points)]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(_render_group, groups, [out] * workers, [dpi] * workers,
+                                      [max_points] * workers))
+    paths = [None] * len(run_dirs)
+    for i, group in enumerate(results):
+        paths[i::workers] = group
+    return paths
+
+
+def main():
+    import argparse
+    from .runreader import RunReader
+    ap = argparse.ArgumentParser(description="Plot a saved run")
+    ap.add_argument("--run-dir", default="data/runs/last")
+    ap.add_argument("--out", default="images")
+    args = ap.parse_args()
+
+    run = RunReader(args.run_dir)
+    ci = run.mean_and_ci()[1] if run.has("traj") else None
+    plot_run(run.t, run.mean(), args.out, ci=ci)
+
+
+if __name__ == "__main__":
+    main()
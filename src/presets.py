@@ -0,0 +1,64 @@
+# Nuclide catalogue and time-unit table (pure Python: importable without NumPy)
+#
+# Every preset stores its half-life in its natural unit and the tracked
+# daughters with branching fractions; decay constants are precomputed for
+# every time unit at import (LAMBDA), so callers look them up instead of
+# converting half-lives again. PRESETS keeps the old (unit, half-life) view.
+
+import math
+from typing import NamedTuple
+
+
+class Nuclide(NamedTuple):
+    name: str                 # display name, e.g. "Tc-99m"
+    unit: str                 # unit of half_life (a key of UNIT_SEC)
+    half_life: float
+    daughters: tuple = ()     # ((catalogue key, branching fraction), ...) of tracked daughters
+
+
+CATALOGUE = {
+    "tc99m": Nuclide("Tc-99m", "h", 6.01),
+    "i131":  Nuclide("I-131", "d", 8.02),
+    "cs137": Nuclide("Cs-137", "y", 30.05),
+    "co60":  Nuclide("Co-60", "y", 5.27),
+    "f18":   Nuclide("F-18", "min", 109.77),
+    "c11":   Nuclide("C-11", "min", 20.334),
+    "n13":   Nuclide("N-13", "min", 9.965),
+    "o15":   Nuclide("O-15", "min", 2.037),
+    "i123":  Nuclide("I-123", "h", 13.22),
+    "tl201": Nuclide("Tl-201", "h", 73.1),
+    "y90":   Nuclide("Y-90", "h", 64.1),
+    "lu177": Nuclide("Lu-177", "d", 6.65),
+    "xe133": Nuclide("Xe-133", "d", 5.25),
+    # 87.6% of Mo-99 decays feed Tc-99m; the rest go to Tc-99 (effectively stable)
+    "mo99":  Nuclide("Mo-99", "h", 66.0, (("tc99m", 0.876),)),
+    "ba133": Nuclide("Ba-133", "y", 10.52),
+}
+
+PRESETS = {key: (n.unit, n.half_life) for key, n in CATALOGUE.items()}
+
+UNIT_SEC = {"s": 1, "min": 60, "h": 3600, "d": 86400, "y": 365.25 * 86400}
+
+
+def lambda_in_unit_from_half_life(half_life_value: float, half_life_unit: str, out_unit: str) -> float:
+    seconds = half_life_value * UNIT_SEC[half_life_unit]
+    lam_per_sec = math.log(2) / seconds
+    return lam_per_sec * UNIT_SEC[out_unit]
+
+
+# λ of every preset in every unit: LAMBDA[key][unit]
+LAMBDA = {key: {u: lambda_in_unit_from_half_life(n.half_life, n.unit, u) for u in UNIT_SEC}
+          for key, n in CATALOGUE.items()}
+
+
+def preset_lambda(key: str, unit: str = None) -> float:
+    """Decay constant of a preset in 1/unit (default: the unit its half-life is given in)."""
+    return LAMBDA[key][CATALOGUE[key].unit if unit is None else unit]
+
+
+def chain_members(key: str) -> list:
+    """The preset and all its tracked descendants, breadth first (the preset itself first)."""
+    members = [key]
+    for k in members:
+        members += [d for d, _ in CATALOGUE[k].daughters if d not in members]
+    return members
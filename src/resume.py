@@ -0,0 +1,96 @@
+import numpy as np
+from .decay import Isotope
+from .simulate import SimConfig, _run_engine, step_probability
+# Resumable binomial runs: checkpoints in meta.json and extension in time or realizations
+#
+# A checkpoint records, per block of realizations, the final bit-generator
+# state and the SeedSequence spawn key the block was started from; the final
+# populations are saved as the N_last array. Blocks are the process-pool
+# shards of src.parallel (a single block for workers=1).
+
+
+def checkpoint(entropy, blocks) -> dict:
+    """
+    meta.json entry for a finished run.
+
+    blocks is a list of (rows, spawn_key, bit_generator_state) in row order;
+    entropy is the root SeedSequence entropy (the seed, or the drawn one).
+    """
+    return {"engine": "binomial", "entropy": entropy,
+            "blocks": [{"rows": int(n), "spawn_key": list(key), "state": state} for n, key, state in blocks]}
+
+
+def _generator(state: dict) -> np.random.Generator:
+    bg = getattr(np.random, state["bit_generator"])()
+    bg.state = state
+    return np.random.Generator(bg)
+
+
+def extend_run(run_dir, tmax=None, add_realizations: int = 0, quiet=False):
+    """
+    Continue a checkpointed run to a later tmax and/or append realizations.
+
+    Time extension continues every block from its saved generator state, so
+    the result is bit-identical to one run made with the longer tmax (same
+    seed and workers). Appended realizations form a new block seeded by the
+    next SeedSequence child, i.e. what simulate_parallel gives that block
+    when run with one more worker. The merged run is saved as a new run
+    directory (meta "extends" names the original, which is left untouched).
+
+    Returns (t, traj, run_dir).
+    """
+    from .runreader import RunReader, load_array
+    from .runstore import count_dtype_for, save_run
+
+    src = RunReader(run_dir)
+    meta = src.meta
+    ck = meta.get("checkpoint")
+    if not ck:
+        raise SystemExit(f"{src.run_dir} has no checkpoint (only binomial MC runs saved by simulate can be extended).")
+    if not src.has("traj"):
+        raise SystemExit(f"{src.run_dir} has no traj to extend.")
+    dt, n0, lam = float(meta["dt"]), int(meta["n0"]), float(meta["lambda"])
+    t_old = src.t
+    tmax = float(t_old[-1]) if tmax is None else float(tmax)
+    t = np.arange(0, tmax + dt, dt)
+    if t.size < t_old.size or not np.allclose(t[:t_old.size], t_old):
+        raise ValueError(f"tmax={tmax} does not extend the run's grid (tmax={t_old[-1]}, dt={dt})")
+    if add_realizations < 0:
+        raise ValueError("add_realizations must be >= 0")
+
+    old = load_array(src.run_dir, "traj")
+    N_last = np.asarray(load_array(src.run_dir, "N_last"), dtype=np.int64)
+    R_old = old.shape[0]
+    traj = np.empty((R_old + add_realizations, t.size), dtype=count_dtype_for(n0, "int32"))
+    traj[:R_old, :t_old.size] = old
+
+    # same p and draw order as the binomial engine, block by block
+    p = step_probability(lam, dt)
+    blocks, r0 = [], 0
+    for b in ck["blocks"]:
+        rng = _generator(b["state"])
+        rows = slice(r0, r0 + b["rows"])
+        N = N_last[rows]
+        for k in range(t_old.size, t.size):
+            N = N - rng.binomial(N, p)
+            traj[rows, k] = N
+        blocks.append((b["rows"], b["spawn_key"], rng.bit_generator.state))
+        r0 += b["rows"]
+
+    if add_realizations:
+        key = (len(ck["blocks"]),)
+        rng = np.random.default_rng(np.random.SeedSequence(ck["entropy"], spawn_key=key))
+        cfg = SimConfig(dt=dt, T=tmax, n_realizations=add_realizations, engine="binomial", save=False)
+        traj[R_old:] = _run_engine(Isotope("X", N0=n0, lam=lam), cfg, rng)[1]
+        blocks.append((add_realizations, key, rng.bit_generator.state))
+
+    store = meta.get("store", {})
+    encodings = {info["kind"] for info in store.get("encoding", {}).values()}
+    new_meta = {k: v for k, v in meta.items() if k not in ("store", "timing", "cache_key")}
+    new_meta.update(tmax=float(t[-1]), n_realizations=int(traj.shape[0]), extends=str(src.run_dir.resolve()),
+                    checkpoint=checkpoint(ck["entropy"], blocks))
+    out = save_run({"t": t, "N": traj.mean(axis=0), "traj": traj, "N_last": traj[:, -1].astype(np.int64)},
+                   new_meta, fmt=store.get("format", "npy"), encoding=encodings.pop() if encodings else None,
+                   quiet=quiet)
+    return t, traj, out
+
@@ -0,0 +1,200 @@
+import json
+from pathlib import Path
+import numpy as np
+from . import instrument
+# Shared run reader: lazy (memory-mapped) access to saved runs, chunked reductions
+# over realizations, and derived series cached in <run>/derived/.
+
+CHUNK_BYTES = 64 << 20   # rows of traj reduced at once (~64 MB)
+
+
+def list_arrays(run_dir) -> list:
+    """Names of every array in a run: run.npz members plus loose .npy/.chunks (e.g. measured.npy from bg)."""
+    run_dir = Path(run_dir)
+    names = {p.stem for p in run_dir.glob("*.npy")}
+    names |= {p.name[:-len(".chunks")] for p in run_dir.glob("*.chunks")}
+    if (run_dir / "run.npz").exists():
+        with np.load(run_dir / "run.npz") as z:
+            names |= set(z.files)
+    return sorted(names)
+
+
+def has_array(run_dir, name: str) -> bool:
+    return name in list_arrays(run_dir)
+
+
+def _blocks(run_dir: Path, name: str):
+    """Column blocks of a "chunked" array, each opened with mmap_mode="r"."""
+    d = run_dir / f"{name}.chunks"
+    n = len(json.loads((d / "index.json").read_text())["bounds"]) - 1
+    return [np.load(d / f"{i:06d}.npy", mmap_mode="r") for i in range(n)]
+
+
+def _encoding(run_dir: Path, name: str):
+    """meta.json's store.encoding entry for one array (None when stored plain)."""
+    p = run_dir / "meta.json"
+    if not p.exists():
+        return None
+    return json.loads(p.read_text()).get("store", {}).get("encoding", {}).get(name)
+
+
+def load_array(run_dir, name: str, mmap=False):
+    """
+    Load one array from a run in any store format.
+
+    With mmap=True, .npy arrays are memory-mapped read-only instead of read
+    into RAM (npz members, chunked and encoded arrays are always materialised).
+    Materialised counts stored unsigned (uint16 on disk) come back as signed
+    int32/int64, so differences cannot wrap around; a memory map keeps the
+    stored dtype (reduce it in float, as RunReader does).
+    """
+    run_dir = Path(run_dir)
+    info = _encoding(run_dir, name)
+    if info is not None:
+        from .runstore import decode_counts
+        return _signed(decode_counts(_load_raw(run_dir, name, mmap=False), info))
+    a = _load_raw(run_dir, name, mmap)
+    return a if isinstance(a, np.memmap) else _signed(a)
+
+
+def _signed(a):
+    if a.dtype.kind != "u":
+        return a
+    return a.astype(np.int32 if a.itemsize < 4 else np.int64)
+
+
+def _load_raw(run_dir: Path, name: str, mmap: bool):
+    if (run_dir / f"{name}.npy").exists():
+        return np.load(run_dir / f"{name}.npy", mmap_mode="r" if mmap else None)
+    if (run_dir / f"{name}.chunks").is_dir():
+        return np.concatenate(_blocks(run_dir, name), axis=-1)
+    if (run_dir / "run.npz").exists():
+        with np.load(run_dir / "run.npz") as z:
+            if name in z.files:
+                return z[name]
+    raise FileNotFoundError(f"No array {name!r} in {run_dir}")
+
+
+class RunReader:
+    """
+    Read-only view of one saved run.
+
+    Large arrays are never loaded whole: traj is memory-mapped (or read block
+    by block for the chunked format) and reduced over realizations in row
+    chunks. Derived series (mean, CI half-width, log counts) are cached as
+    derived/<name>.npy and reused while they are newer than the run data.
+    """
+
+    def __init__(self, run_dir):
+        self.run_dir = Path(run_dir)
+        if not self.run_dir.is_dir():
+            raise SystemExit(f"No run directory {self.run_dir}.")
+        self._meta = None
+
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            p = self.run_dir / "meta.json"
+            self._meta = json.loads(p.read_text()) if p.exists() else {}
+        return self._meta
+
+    def has(self, name: str) -> bool:
+        return has_array(self.run_dir, name)
+
+    def array(self, name: str):
+        return load_array(self.run_dir, name, mmap=True)
+
+    @property
+    def t(self):
+        return np.asarray(self.array("t"), dtype=float)
+
+    # --- chunked reductions over realizations ---
+    def _row_blocks(self, name="traj"):
+        """Yield (column offset, 2-D piece) of traj; the pieces together cover every element once."""
+        if (self.run_dir / f"{name}.chunks").is_dir():
+            blocks, offsets = _blocks(self.run_dir, name), []
+            start = 0
+            for b in blocks:
+                offsets.append(start)
+                start += b.shape[-1]
+            for b, off in zip(blocks, offsets):
+                yield from ((off, piece) for piece in self._split_rows(b))
+        else:
+            yield from ((0, piece) for piece in self._split_rows(self.array(name)))
+
+    def row_chunks(self, name="traj"):
+        """Yield full-width row chunks of a 2-D array (realizations x time) as float arrays."""
+        if (self.run_dir / f"{name}.chunks").is_dir():
+            blocks = _blocks(self.run_dir, name)
+            width = sum(b.shape[-1] for b in blocks)
+            rows = max(1, CHUNK_BYTES // max(1, width * 8))
+            for r0 in range(0, blocks[0].shape[0], rows):
+                yield np.concatenate([np.asarray(b[r0:r0 + rows], dtype=float) for b in blocks], axis=-1)
+        else:
+            yield from self._split_rows(self.array(name))
+
+    @staticmethod
+    def _split_rows(a):
+        rows = max(1, CHUNK_BYTES // max(1, a.shape[-1] * a.itemsize))
+        for r0 in range(0, a.shape[0], rows):
+            yield np.asarray(a[r0:r0 + rows], dtype=float)
+
+    def _moments(self, name="traj"):
+        """Per-step RunningStats of a 2-D array, merged row chunk by row chunk (Welford/Chan)."""
+        from .analysis import RunningStats
+        stats = RunningStats(self.t.size)
+        for off, piece in self._row_blocks(name):
+            stats.push(slice(off, off + piece.shape[1]), piece)
+        return stats
+
+    # --- cached derived series ---
+    def _derived(self, name: str, compute, sources=("traj",)):
+        path = self.run_dir / "derived" / f"{name}.npy"
+        src_mtime = max((p.stat().st_mtime for s in sources for p in self._source_paths(s)), default=0.0)
+        if path.exists() and path.stat().st_mtime >= src_mtime:
+            return np.load(path)
+        value = np.asarray(compute())
+        try:
+            path.parent.mkdir(exist_ok=True)
+            np.save(path, value)
+        except OSError:
+            pass  # read-only run dir: just don't cache
+        return value
+
+    def _source_paths(self, name):
+        for p in (self.run_dir / f"{name}.npy", self.run_dir / f"{name}.chunks", self.run_dir / "run.npz"):
+            if p.exists():
+                yield p
+
+    def mean(self):
+        """Mean over realizations: N.npy if saved, else traj reduced in row chunks (cached)."""
+        for cand in ("N", "counts"):
+            if self.has(cand):
+                return np.asarray(self.array(cand), dtype=float)
+        if not self.has("traj"):
+            raise SystemExit("No N/counts/traj arrays in run dir.")
+        def _mean():
+            return self._moments().mean
+        return self._derived("N_mean", _mean)
+
+    def mean_and_ci(self, alpha=0.05):
+        """(mean, CI half-width) like analysis.mean_and_ci, without loading traj (cached)."""
+        def _ci():
+            return np.stack(self._moments().mean_and_ci(alpha))
+        m, half = self._derived(f"N_ci{1 - alpha:g}", _ci)
+        return m, half
+
+    def log_counts(self):
+        """ln of the mean curve (NaN where it is 0), cached."""
+        def _log():
+            m = self.mean()
+            with np.errstate(divide="ignore"):
+                return np.where(m > 0, np.log(np.where(m > 0, m, 1.0)), np.nan)
+        return self._derived("log_N", _log, sources=("N", "counts", "traj"))
+
+
+def load_series(run_dir):
+    """(t, mean counts, meta) of a saved run — the one loader used by analyze/plot/bg."""
+    with instrument.phase("load"):
+        run = RunReader(run_dir)
+        return run.t, run.mean(), run.meta
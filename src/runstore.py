@@ -0,0 +1,241 @@
+import json
+import time
+from pathlib import Path
+import numpy as np
+from . import instrument
+from .runreader import load_array, list_arrays
+# Run store: writes simulation results under data/runs/<run>/ in a selectable format
+#
+#   "npy"      one <name>.npy per array (default; memory-mappable)
+#   "npz"      a single compressed run.npz
+#   "chunked"  2-D arrays as <name>.chunks/<i>.npy column blocks, appendable while simulating
+#
+# CSV copies are an opt-in export (csv=True or export_csv), never the default.
+# Count arrays can also be encoded ("npy"/"npz" only; decoded by src.runreader):
+#
+#   "tail"     trailing all-zero columns (every realization extinct) are dropped
+#   "delta"    decays per step instead of survivors, in the smallest unsigned dtype
+#
+# Reading runs back lives in src.runreader.
+
+FORMATS = ("npy", "npz", "chunked")
+ENCODINGS = ("tail", "delta")
+COUNT_ARRAYS = ("traj", "traj_sample")   # integer-valued counts, stored downcast
+RUNS_ROOT = "data/runs"
+
+
+def new_run_dir(root=RUNS_ROOT) -> Path:
+    """Fresh run_<timestamp> directory; runs started in the same second get a -1, -2, ... suffix."""
+    out_root = Path(root)
+    out_root.mkdir(parents=True, exist_ok=True)
+    stem = time.strftime("run_%Y%m%d-%H%M%S")
+    for i in range(10000):
+        run_dir = out_root / (stem if i == 0 else f"{stem}-{i}")
+        try:
+            run_dir.mkdir()
+            return run_dir
+        except FileExistsError:
+            continue
+    raise RuntimeError(f"Could not create a unique run directory under {out_root}")
+
+
+def update_last(run_dir: Path, root=RUNS_ROOT) -> None:
+    last = Path(root) / "last"
+    try:
+        if last.exists() or last.is_symlink():
+            last.unlink()
+        last.symlink_to(Path(run_dir).resolve())
+    except Exception:
+        pass  # e.g., Windows without symlink perms
+
+
+def count_dtype_for(max_count, count_dtype="auto"):
+    """
+    Dtype for counts in [0, max_count]: "auto" picks uint16, int32 or int64,
+    "int32" never goes below int32; float32/float64 on request.
+    """
+    if count_dtype in ("float32", "float64"):
+        return np.dtype(count_dtype)
+    if count_dtype == "auto" and max_count < 2**16:
+        return np.dtype(np.uint16)
+    return np.dtype(np.int32 if max_count < 2**31 else np.int64)
+
+
+def _downcast(name, v, count_dtype):
+    """Store integer-valued count arrays in count_dtype; anything with fractions or NaNs stays float."""
+    v = np.asarray(v)
+    if count_dtype is None or name not in COUNT_ARRAYS or v.size == 0:
+        return v
+    if not np.issubdtype(v.dtype, np.integer) and not np.array_equal(v, np.rint(v)):
+        return v      # interpolated (adaptive engine) or NaN-padded: not counts, keep as is
+    return v.astype(count_dtype_for(v.max(), count_dtype))
+
+
+def encode_counts(v, encoding):
+    """
+    Encode a (..., steps) array of survivor counts; returns (stored array, info).
+
+    info holds what decode_counts needs ("kind", full "shape", "dtype" and for
+    delta the per-row "first" value) and goes into meta.json.
+    """
+    v = np.asarray(v)
+    info = {"kind": encoding, "shape": list(v.shape), "dtype": str(v.dtype)}
+    if encoding == "tail":
+        alive = np.flatnonzero(v.reshape(-1, v.shape[-1]).any(axis=0))
+        return v[..., :alive[-1] + 1 if alive.size else 0], info
+    if encoding == "delta":
+        first = v[..., :1].astype(np.int64)
+        steps = -np.diff(v.astype(np.int64), axis=-1)
+        if steps.size and steps.min() < 0:
+            raise ValueError("delta encoding needs non-increasing counts along time")
+        info["first"] = first[..., 0].tolist()
+        return steps.astype(_unsigned_for(steps.max(initial=0))), info
+    raise ValueError(f"unknown count encoding {encoding!r}; choose from {ENCODINGS}")
+
+
+def decode_counts(stored, info):
+    """Inverse of encode_counts."""
+    shape, dtype = tuple(info["shape"]), np.dtype(info["dtype"])
+    if info["kind"] == "tail":
+        out = np.zeros(shape, dtype=dtype)
+        out[..., :stored.shape[-1]] = stored
+        return out
+    first = np.asarray(info["first"], dtype=np.int64)[..., None]
+    out = np.empty(shape, dtype=np.int64)
+    out[..., :1] = first
+    np.cumsum(stored, axis=-1, dtype=np.int64, out=out[..., 1:])
+    out[..., 1:] = first - out[..., 1:]
+    return out.astype(dtype)
+
+
+def _unsigned_for(max_value):
+    for dt in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dt).max:
+            return np.dtype(dt)
+    return np.dtype(np.uint64)
+
+
+def _write_chunks(run_dir: Path, name: str, v, chunk_steps: int):
+    d = run_dir / f"{name}.chunks"
+    d.mkdir(exist_ok=True)
+    bounds = list(range(0, v.shape[-1], chunk_steps)) + [v.shape[-1]]
+    for i, (a, b) in enumerate(zip(bounds[:-1], bounds[1:])):
+        np.save(d / f"{i:06d}.npy", v[..., a:b])
+    index = {"shape": list(v.shape), "dtype": str(v.dtype), "bounds": bounds}
+    (d / "index.json").write_text(json.dumps(index))
+
+
+def save_run(arrays: dict, meta: dict, fmt="npy", csv=False, count_dtype="auto", encoding=None,
+             root=RUNS_ROOT, chunk_steps=1024, quiet=False) -> Path:
+    """
+    Save one run and point data/runs/last at it.
+
+    Parameters
+    ----------
+    arrays : dict
+        name -> array (t, N, traj, ...).
+    fmt : {"npy", "npz", "chunked"}
+        Storage layout (see module header).
+    csv : bool
+        Also export CSV copies (slow and large for traj; off by default).
+    count_dtype : {"auto", "int32", "float32", "float64", None}
+        Storage dtype for count arrays (traj); "auto" is the smallest lossless
+        one of uint16/int32/int64.
+    encoding : {None, "tail", "delta"}
+        Encoding of integer count arrays (see module header); not for "chunked".
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown run format {fmt!r}; choose from {FORMATS}")
+    if encoding is not None and (fmt == "chunked" or encoding not in ENCODINGS):
+        raise ValueError(f"encoding must be one of {ENCODINGS} with format npy or npz")
+    run_dir = new_run_dir(root)
+    encoded = {}
+    with instrument.phase("save"):
+        arrays = {k: _downcast(k, v, count_dtype) for k, v in arrays.items()}
+        stored = dict(arrays)
+        if encoding is not None:
+            for k in COUNT_ARRAYS:
+                if k in arrays and np.issubdtype(arrays[k].dtype, np.integer):
+                    stored[k], encoded[k] = encode_counts(arrays[k], encoding)
+        if fmt == "npz":
+            np.savez_compressed(run_dir / "run.npz", **stored)
+        else:
+            for k, v in stored.items():
+                if fmt == "chunked" and v.ndim >= 2:
+                    _write_chunks(run_dir, k, v, chunk_steps)
+                else:
+                    np.save(run_dir / f"{k}.npy", v)
+    if csv:
+        with instrument.phase("save.csv"):
+            export_csv(run_dir, arrays)
+    if instrument.enabled():
+        instrument.count("bytes_written", sum(p.stat().st_size for p in run_dir.rglob("*") if p.is_file()))
+
+    store = {"format": fmt, "dtypes": {k: str(v.dtype) for k, v in arrays.items()}}
+    if encoded:
+        store["encoding"] = encoded
+    meta = dict(meta, store=store)
+    (run_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    update_last(run_dir, root)
+    if not quiet:
+        print(f"[OK] Saved results to: {run_dir}")
+    return run_dir
+
+
+def export_csv(run_dir, arrays=None) -> None:
+    """Write <name>.csv next to a run (opt-in; 1-D and 2-D arrays only)."""
+    run_dir = Path(run_dir)
+    if arrays is None:
+        arrays = {name: load_array(run_dir, name) for name in list_arrays(run_dir)}
+    for k, v in arrays.items():
+        v = np.asarray(v)
+        if v.ndim <= 2:
+            fmt = "%d" if np.issubdtype(v.dtype, np.integer) else "%.18e"
+            np.savetxt(run_dir / f"{k}.csv", v, delimiter=",", fmt=fmt)
+
+
+class RunWriter:
+    """
+    Incremental writer for the "chunked" format.
+
+    append(name, block) adds a block of columns (last axis = time) as soon as
+    the simulation has produced it, so the full traj never sits in memory;
+    write(name, array) stores small complete arrays; close() writes meta.json
+    and updates data/runs/last.
+    """
+
+    def __init__(self, meta: dict, root=RUNS_ROOT):
+        self.meta = dict(meta)
+        self.root = root
+        self.run_dir = new_run_dir(root)
+        self._index = {}
+        self._dtypes = {}
+
+    def write(self, name: str, array):
+        array = np.asarray(array)
+        np.save(self.run_dir / f"{name}.npy", array)
+        self._dtypes[name] = str(array.dtype)
+
+    def append(self, name: str, block):
+        block = np.asarray(block)
+        d = self.run_dir / f"{name}.chunks"
+        idx = self._index.get(name)
+        if idx is None:
+            d.mkdir(exist_ok=True)
+            idx = self._index[name] = {"shape": list(block.shape[:-1]), "dtype": str(block.dtype), "bounds": [0]}
+            self._dtypes[name] = str(block.dtype)
+        with instrument.phase("save"):
+            np.save(d / f"{len(idx['bounds']) - 1:06d}.npy", block)
+        instrument.count("bytes_written", block.nbytes)
+        idx["bounds"].append(idx["bounds"][-1] + block.shape[-1])
+
+    def close(self, quiet=False) -> Path:
+        for name, idx in self._index.items():
+            idx = dict(idx, shape=idx["shape"] + [idx["bounds"][-1]])
+            (self.run_dir / f"{name}.chunks" / "index.json").write_text(json.dumps(idx))
+        meta = dict(self.meta, store={"format": "chunked", "dtypes": self._dtypes})
+        (self.run_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+        update_last(self.run_dir, self.root)
+        if not quiet:
+            print(f"[OK] Saved results to: {self.run_dir}")
+        return self.run_dir
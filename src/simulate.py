@@ -1,17 +1,15 @@
 import numpy as np
-from dataclasses import dataclass
-from .decay import Isotope
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional
+from . import instrument
+from .analysis import RunningStats
+from .decay import Isotope, decay_table
 # Monte Carlo engines for radioactive decay (binomial default; optional Numba)
 
-# --- Optional: Numba JIT for speed (fallback-safe) ---
-try:
-    from numba import njit
-    NUMBA_AVAILABLE = True
-except Exception:
-    NUMBA_AVAILABLE = False
-    def njit(*args, **kwargs):
-        def _wrap(f): return f
-        return _wrap
+# --- Optional: Numba JIT for speed (imported lazily from src._numba_kernels) ---
+NUMBA_AVAILABLE = find_spec("numba") is not None
 
 
 @dataclass
@@ -19,7 +17,44 @@ class SimConfig:
     dt: float
     T: float
     n_realizations: int
-    engine: str = "binomial"   # "binomial" (fast), "per_nucleus" (slow), "numba" (JIT per-nucleus)
+    engine: str = "binomial"   # "binomial" (fast), "per_nucleus" (slow), "numba" (parallel JIT binomial), "exact", "adaptive"
+    t_eval: Optional[np.ndarray] = None   # "exact"/"adaptive": output times (any sorted grid); default 0..T step dt
+    tol: float = 1.0           # "adaptive" only: max std (nuclei) of the interpolated points
+    save: bool = True          # write the run to data/runs/ (False: in-memory only)
+    store: str = "npy"         # run format: "npy", "npz" (compressed) or "chunked" (see runstore)
+    csv: bool = False          # also export CSV copies (opt-in; slow for large traj)
+    count_dtype: str = "auto"  # saved traj dtype: "auto" (uint16/int32/int64 from N0), "int32" or "float64"
+    encoding: Optional[str] = None   # saved traj encoding: None, "tail" or "delta" (see runstore)
+
+
+def traj_dtype(N0: int, cfg: SimConfig) -> np.dtype:
+    """
+    dtype the integer engines fill traj with: int32/int64 (float64 on request).
+
+    Counts never exceed N0, so it is lossless; it stays signed so that
+    differences of counts cannot wrap around. Unsigned dtypes (count_dtype
+    "auto") are only used by the run store on disk.
+    """
+    from .runstore import count_dtype_for
+    return count_dtype_for(N0, "int32" if cfg.count_dtype == "auto" else cfg.count_dtype)
+
+
+def step_probability(lam, dt):
+    """
+    Per-step decay probability p = 1 - e^{-λ dt} of every binomial engine.
+
+    Taken with expm1, so it stays accurate for tiny λ·dt, and shared by all
+    engines so that the same rng gives the same draws whichever one runs.
+    Scalars are memoized per (λ, dt); arrays broadcast.
+    """
+    if np.ndim(lam) or np.ndim(dt):
+        return -np.expm1(-np.asarray(lam, dtype=float) * np.asarray(dt, dtype=float))
+    return _step_probability(float(lam), float(dt))
+
+
+@lru_cache(maxsize=1024)
+def _step_probability(lam: float, dt: float) -> float:
+    return float(-np.expm1(-lam * dt))
 
 
 def simulate_isotope(iso: Isotope, cfg: SimConfig, rng: np.random.Generator):
@@ -30,33 +65,71 @@ def simulate_isotope(iso: Isotope, cfg: SimConfig, rng: np.random.Generator):
     -------
     - "binomial": fast, RNG binomial draws (recommended default)
     - "per_nucleus": simple/reference implementation (slow)
-    - "numba": JIT per-nucleus engine (bonus; faster than plain per_nucleus)
+    - "numba": parallel JIT binomial kernel over all realizations (multi-core)
+    - "exact": event-driven, no dt discretisation; samples decay times (or exact
+      survivals between output points) and bins them onto ``cfg.t_eval``
+    - "adaptive": binomial jumps sized by the expected decay count (fine early,
+      coarse in the tail) under ``cfg.tol``, resampled onto the output grid
+
+    traj holds integer counts in ``traj_dtype(iso.N0, cfg)`` (the adaptive
+    engine's interpolated points are float64). The run is saved under
+    data/runs/ unless ``cfg.save`` is False.
     """
+    with instrument.phase("simulate"):
+        t, traj = _run_engine(iso, cfg, rng)
+    if cfg.save:
+        N_mean = traj.mean(axis=0)
+        _save_run(
+            {"t": t, "N": N_mean, "traj": traj},
+            {"mode": cfg.engine, "n0": iso.N0, "lambda": iso.lam, "tmax": float(t[-1]), "dt": cfg.dt,
+             "n_realizations": cfg.n_realizations},
+            cfg,
+        )
+    return t, traj
+
+
+def _run_engine(iso: Isotope, cfg: SimConfig, rng: np.random.Generator):
+    """Dispatch to one engine and return (t, traj) without saving anything."""
+    # ---- EXACT branch (cost ~ min(N0, output points), independent of T/dt) ----
+    if cfg.engine == "exact":
+        if cfg.t_eval is not None:
+            t = np.asarray(cfg.t_eval, dtype=float)
+        else:
+            t = np.arange(0, cfg.T + cfg.dt, cfg.dt)
+        traj = _simulate_exact(iso.N0, iso.lam, t, cfg.n_realizations, rng, dtype=traj_dtype(iso.N0, cfg))
+        instrument.count("rng_variates", cfg.n_realizations * min(iso.N0, t.size))
+        return t, traj
+
     t = np.arange(0, cfg.T + cfg.dt, cfg.dt)
 
+    # ---- ADAPTIVE branch (few RNG calls once decays get sparse) ----
+    if cfg.engine == "adaptive":
+        if cfg.t_eval is not None:
+            t = np.asarray(cfg.t_eval, dtype=float)
+        traj, n_steps = _simulate_adaptive(iso.N0, iso.lam, t, cfg.n_realizations, rng, cfg.tol)
+        instrument.count("rng_calls", n_steps)
+        instrument.count("rng_variates", n_steps * cfg.n_realizations)
+        return t, traj
+
     # ---- NUMBA branch ----
     if cfg.engine == "numba":
         if not NUMBA_AVAILABLE:
             raise RuntimeError("Numba not available. Install numba or use engine='binomial'.")
-        steps = t.size
-        traj = np.empty((cfg.n_realizations, steps), dtype=np.float64)
-        for r in range(cfg.n_realizations):
-            traj[r, :] = _simulate_single_numba(iso.N0, iso.lam, cfg.dt, steps)
-
-        N_mean = traj.mean(axis=0).astype(float)
-        _save_run(
-            {"t": t, "N": N_mean, "traj": traj},
-            {"mode": "numba", "n0": iso.N0, "lambda": iso.lam, "tmax": cfg.T, "dt": cfg.dt,
-             "n_realizations": cfg.n_realizations}
-        )
+        p = step_probability(iso.lam, cfg.dt)
+        # one seed per realization, drawn from rng -> reproducible for a given rng
+        seeds = rng.integers(0, 2**32, size=cfg.n_realizations, dtype=np.int64)
+        from ._numba_kernels import simulate_numba
+        traj = np.empty((cfg.n_realizations, t.size), dtype=traj_dtype(iso.N0, cfg))
+        simulate_numba(iso.N0, p, seeds, traj)
+        instrument.count("rng_variates", cfg.n_realizations * (t.size - 1))
         return t, traj
 
     # ---- BINOMIAL branch (vectorized over realizations) ----
     if cfg.engine == "binomial":
-        p = 1.0 - np.exp(-iso.lam * cfg.dt)
+        p = step_probability(iso.lam, cfg.dt)
         steps = t.size
         R = cfg.n_realizations
-        traj = np.empty((R, steps), dtype=np.float64)
+        traj = np.empty((R, steps), dtype=traj_dtype(iso.N0, cfg))
 
         N = np.full(R, iso.N0, dtype=np.int64)
         traj[:, 0] = N
@@ -64,20 +137,15 @@ def simulate_isotope(iso: Isotope, cfg: SimConfig, rng: np.random.Generator):
             decayed = rng.binomial(N, p)
             N = N - decayed
             traj[:, k] = N
-
-        N_mean = traj.mean(axis=0).astype(float)
-        _save_run(
-            {"t": t, "N": N_mean, "traj": traj},
-            {"mode": "binomial", "n0": iso.N0, "lambda": iso.lam, "tmax": cfg.T, "dt": cfg.dt,
-             "n_realizations": cfg.n_realizations}
-        )
+        instrument.count("rng_calls", steps - 1)
+        instrument.count("rng_variates", R * (steps - 1))
         return t, traj
 
     # ---- PER-NUCLEUS reference branch (slow) ----
-    p = 1.0 - np.exp(-iso.lam * cfg.dt)
+    p = step_probability(iso.lam, cfg.dt)
     steps = t.size
     R = cfg.n_realizations
-    traj = np.zeros((R, steps), dtype=float)
+    traj = np.zeros((R, steps), dtype=traj_dtype(iso.N0, cfg))
     for r in range(R):
         n = iso.N0
         traj[r, 0] = n
@@ -85,61 +153,608 @@ def simulate_isotope(iso: Isotope, cfg: SimConfig, rng: np.random.Generator):
             decayed = (rng.random(n) < p).sum()
             n -= decayed
             traj[r, k] = n
-
-    N_mean = traj.mean(axis=0).astype(float)
-    _save_run(
-        {"t": t, "N": N_mean, "traj": traj},
-        {"mode": "per_nucleus", "n0": iso.N0, "lambda": iso.lam, "tmax": cfg.T, "dt": cfg.dt,
-         "n_realizations": cfg.n_realizations}
-    )
+    instrument.count("rng_calls", R * (steps - 1))
     return t, traj
 
 
+@dataclass
+class BatchResult:
+    """
+    Trajectory tensor of a batched run with labelled axes.
 
-@njit
-def _simulate_single_numba(N0: int, lam: float, dt: float, steps: int):
+    traj has shape (R, *population_shape, steps) and dims names every axis,
+    e.g. ("realization", "isotope", "time"). Populations whose own grid is
+    shorter (larger dt) are padded with NaN past their T.
     """
-    JIT-compiled per-nucleus simulation for one realization.
-    NOTE: Use with moderate N0 or realizations; default 'binomial' is fastest overall.
+    t: np.ndarray            # (*population_shape, steps): column times per population
+    traj: np.ndarray         # (R, *population_shape, steps)
+    dims: tuple
+    coords: dict = field(default_factory=dict)
+
+    def axis(self, dim: str) -> int:
+        return self.dims.index(dim)
+
+    def mean(self):
+        """Mean over realizations, shape (*population_shape, steps)."""
+        return self.traj.mean(axis=0)
+
+    def total(self, dim: str = "isotope"):
+        """Sum over one population axis, e.g. the MC counts of a mixture."""
+        return self.traj.sum(axis=self.axis(dim))
+
+
+def simulate_batch(N0, lam, dt, T: float, n_realizations: int, rng: np.random.Generator,
+                   dims=None, coords=None) -> BatchResult:
     """
-    p = 1 - np.exp(-lam * dt)
-    traj = np.empty(steps, dtype=np.float64)
-    traj[0] = N0
-    N = N0
+    Binomial engine over many populations at once.
+
+    N0, lam and dt are broadcast together to a population shape (for example a
+    list of isotopes, an N0 x dt sweep grid, or both); every population is then
+    advanced in the same step loop with one rng.binomial call per step, so a
+    12-point sweep costs about as much as a single simulate_isotope run.
+
+    Parameters
+    ----------
+    N0, lam, dt : array_like
+        Initial nuclei, decay constants and time steps (broadcastable).
+    T : float
+        Simulated time span, shared by all populations.
+    n_realizations : int
+        Number of independent realizations (R).
+    rng : np.random.Generator
+    dims : tuple of str, optional
+        Names of the population axes (default "population" / "population_<i>").
+    coords : dict, optional
+        Labels for the population axes, e.g. {"isotope": ["F-18", "C-11"]}.
+
+    Returns
+    -------
+    BatchResult
+        traj of shape (R, *population_shape, steps), no run is saved.
+    """
+    N0, lam, dt = np.broadcast_arrays(np.asarray(N0, dtype=np.int64),
+                                      np.asarray(lam, dtype=float),
+                                      np.asarray(dt, dtype=float))
+    shape = N0.shape
+    if dims is None:
+        dims = ("population",) if len(shape) == 1 else tuple(f"population_{i}" for i in range(len(shape)))
+    dims = tuple(dims)
+    if len(dims) != len(shape):
+        raise ValueError(f"dims {dims} do not match population shape {shape}")
+
+    # same column count as np.arange(0, T + dt, dt) in simulate_isotope
+    n_steps = np.vectorize(lambda d: np.arange(0, T + d, d).size, otypes=[np.int64])(dt)
+    steps = int(n_steps.max())
+    t = np.arange(steps) * dt[..., None]
+
+    R = n_realizations
+    p = step_probability(lam, dt)
+    N = np.broadcast_to(N0, (R,) + shape).copy()
+    traj = np.empty((R,) + shape + (steps,), dtype=np.float64)
+    traj[..., 0] = N
     for k in range(1, steps):
-        decayed = 0
-        # per-nucleus thinning
-        for i in range(N):
-            if np.random.random() < p:
-                decayed += 1
-        N -= decayed
-        traj[k] = N
+        N -= rng.binomial(N, p)
+        traj[..., k] = N
+
+    past = np.arange(steps) >= n_steps[..., None]
+    if past.any():
+        traj[:, past] = np.nan
+    return BatchResult(t=t, traj=traj, dims=("realization",) + dims + ("time",), coords=dict(coords or {}))
+
+
+def simulate_isotopes(isotopes, cfg: SimConfig, rng: np.random.Generator) -> BatchResult:
+    """
+    Batched binomial run of several isotopes sharing one SimConfig.
+
+    The isotope axis is labelled "isotope"; result.total() gives the MC
+    counts of the mixture.
+    """
+    return simulate_batch([iso.N0 for iso in isotopes], [iso.lam for iso in isotopes],
+                          cfg.dt, cfg.T, cfg.n_realizations, rng,
+                          dims=("isotope",), coords={"isotope": [iso.name for iso in isotopes]})
+
+
+@dataclass
+class MixtureResult:
+    """
+    Multi-isotope source sampled per time bin.
+
+    N has shape (R, n_isotopes, len(t)) (survivors at each t) and decays
+    (R, n_isotopes, len(t) - 1) (decays in [t[k], t[k+1])); the isotope axis
+    is labelled by names.
+    """
+    t: np.ndarray
+    N: np.ndarray
+    decays: np.ndarray
+    names: list = field(default_factory=list)
+
+    def total(self):
+        """Survivors of the whole source, shape (R, len(t))."""
+        return self.N.sum(axis=1)
+
+    def activity(self):
+        """Mean activity per bin and isotope (decays / bin width), shape (R, n_isotopes, len(t) - 1)."""
+        return self.decays / np.diff(self.t)
+
+    def total_activity(self):
+        return self.activity().sum(axis=1)
+
+
+def bin_probabilities(lam, t):
+    """
+    Probability that a nucleus decays in each bin of t, plus survival past t[-1].
+
+    Returns shape (n_isotopes, len(t) + 1): column 0 is decay before t[0],
+    column k is decay in [t[k-1], t[k]), the last column survival beyond
+    t[-1]. Differences of exp are taken with expm1, so long-lived isotopes
+    keep their tiny per-bin probabilities.
+    """
+    lam = np.asarray(lam, dtype=float)[:, None]
+    edges = np.concatenate([[0.0], np.asarray(t, dtype=float)])
+    S = np.exp(-lam * edges)
+    p = np.empty((lam.shape[0], edges.size))
+    p[:, :-1] = S[:, :-1] * -np.expm1(-lam * np.diff(edges))
+    p[:, -1] = S[:, -1]
+    return p
+
+
+def simulate_mixture(isotopes, t, n_realizations: int, rng: np.random.Generator) -> MixtureResult:
+    """
+    MC of a multi-isotope source on the output grid t (any sorted grid from >= 0).
+
+    Each nucleus' decay time falls into one bin of t (or beyond it) with the
+    exact probabilities of bin_probabilities, so the per-bin decay counts of
+    an isotope are Multinomial(N0, p) and all isotopes and realizations are
+    drawn in one rng.multinomial call. The cost is O(R x isotopes x bins)
+    whatever N0 is, so sources of 10^9+ nuclei cost the same as 10^3.
+    """
+    t = np.asarray(t, dtype=float)
+    if t.ndim != 1 or t.size < 2 or t[0] < 0 or np.any(np.diff(t) <= 0):
+        raise ValueError("t must be an increasing, non-negative 1-D grid with at least two points")
+    N0 = np.array([iso.N0 for iso in isotopes], dtype=np.int64)
+    p = bin_probabilities([iso.lam for iso in isotopes], t)
+    draws = rng.multinomial(N0, p, size=(n_realizations, N0.size))
+    instrument.count("rng_calls", 1)
+    instrument.count("rng_variates", draws.size)
+
+    N = N0[:, None] - np.cumsum(draws[..., :-1], axis=-1)
+    return MixtureResult(t=t, N=N, decays=draws[..., 1:-1], names=[iso.name for iso in isotopes])
+
+
+def run_mixture(isotopes, tmax: float, dt: float, realizations: int = 20, seed=None, meta=None,
+                save: bool = True):
+    """
+    simulate_mixture on 0..tmax step dt, saved like a single-isotope run.
+
+    traj and N hold the whole source (so plot/analyze work unchanged);
+    N_iso (isotopes x steps) and A (total activity per bin) are saved next
+    to them. Returns (t, result, run_dir).
+    """
+    t = np.arange(0, tmax + dt, dt)
+    with instrument.phase("simulate"):
+        res = simulate_mixture(isotopes, t, realizations, np.random.default_rng(seed))
+    run_dir = None
+    if save:
+        total = res.total()
+        run_dir = _save_run(
+            {"t": t, "N": total.mean(axis=0), "traj": total, "N_iso": res.N.mean(axis=0),
+             "A": res.total_activity().mean(axis=0)},
+            {"mode": "mixture", "n0": int(sum(iso.N0 for iso in isotopes)), "tmax": float(t[-1]), "dt": dt,
+             "n_realizations": realizations, "seed": seed,
+             "isotopes": [{"name": iso.name, "n0": iso.N0, "lambda": iso.lam} for iso in isotopes], **(meta or {})},
+        )
+    return t, res, run_dir
+
+
+@dataclass
+class StreamResult:
+    """
+    Summary of a streaming run: per-step statistics, no (R x steps) matrix.
+
+    quantiles maps each requested q to a (steps,) array; sample holds the
+    first `keep` realizations in full (realizations are i.i.d., so this is an
+    unbiased subsample).
+    """
+    t: np.ndarray
+    stats: RunningStats
+    quantiles: dict = field(default_factory=dict)
+    sample: Optional[np.ndarray] = None
+
+    @property
+    def mean(self):
+        return self.stats.mean
+
+    def mean_and_ci(self, alpha=0.05):
+        return self.stats.mean_and_ci(alpha)
+
+
+def simulate_stream(iso: Isotope, cfg: SimConfig, rng: np.random.Generator,
+                    quantiles=(), keep: int = 0) -> StreamResult:
+    """
+    Run the "binomial" or "exact" engine as a streaming reducer.
+
+    Only the current populations (R,) and per-step summaries (steps,) are kept,
+    so memory is O(steps + R) instead of O(R*steps). For the binomial engine
+    the statistics equal those of simulate_isotope's traj for the same rng.
+
+    Parameters
+    ----------
+    quantiles : sequence of float
+        Per-step quantiles to track, computed exactly over all R realizations.
+    keep : int
+        Number of full trajectories to keep as a subsample.
+
+    Unless ``cfg.save`` is False the summary arrays (t, N, N_std, N_min,
+    N_max, quantiles, traj_sample) are saved like any other run.
+    """
+    if cfg.engine == "binomial":
+        t = np.arange(0, cfg.T + cfg.dt, cfg.dt)
+        draws = np.full(t.size - 1, step_probability(iso.lam, cfg.dt))   # decay probability per step
+    elif cfg.engine == "exact":
+        t = np.asarray(cfg.t_eval, dtype=float) if cfg.t_eval is not None else np.arange(0, cfg.T + cfg.dt, cfg.dt)
+        draws = np.exp(-iso.lam * np.diff(t, prepend=0.0))             # survival probability per gap
+    else:
+        raise ValueError(f"streaming supports engine 'binomial' or 'exact', not {cfg.engine!r}")
+
+    R = cfg.n_realizations
+    keep = min(keep, R)
+    qs = tuple(float(q) for q in quantiles)
+    acc = RunningStats(t.size)
+    qarr = np.empty((len(qs), t.size))
+    sample = np.empty((keep, t.size), dtype=traj_dtype(iso.N0, cfg)) if keep else None
+
+    def _record(k, N):
+        acc.push(k, N)
+        if qs:
+            qarr[:, k] = np.quantile(N, qs)
+        if keep:
+            sample[:, k] = N[:keep]
+
+    N = np.full(R, iso.N0, dtype=np.int64)
+    if cfg.engine == "binomial":
+        _record(0, N)
+        for k in range(1, t.size):
+            N = N - rng.binomial(N, draws[k - 1])
+            _record(k, N)
+    else:
+        for k in range(t.size):
+            if draws[k] < 1.0 and N.any():
+                N = rng.binomial(N, draws[k])
+            _record(k, N)
+
+    res = StreamResult(t=t, stats=acc, quantiles=dict(zip(qs, qarr)), sample=sample)
+    if cfg.save:
+        _save_stream(res, iso, cfg)
+    return res
+
+
+def _save_stream(res: StreamResult, iso: Isotope, cfg: SimConfig, **extra_meta):
+    acc = res.stats
+    arrays = {"t": res.t, "N": acc.mean, "N_std": np.sqrt(acc.var), "N_min": acc.min, "N_max": acc.max}
+    for q, v in res.quantiles.items():
+        arrays[f"N_q{q:g}"] = v
+    if res.sample is not None:
+        arrays["traj_sample"] = res.sample
+    meta = {"mode": f"{cfg.engine}-stream", "n0": iso.N0, "lambda": iso.lam, "tmax": float(res.t[-1]),
+            "dt": cfg.dt, "n_realizations": cfg.n_realizations, "quantiles": list(res.quantiles),
+            "keep": 0 if res.sample is None else len(res.sample)}
+    meta.update(extra_meta)
+    _save_run(arrays, meta, cfg)
+
+
+# rows x N0 decay times sampled at once by the exact engine (~32 MB of float64)
+_EXACT_CHUNK = 1 << 22
+
+
+def _simulate_exact(N0: int, lam: float, t: np.ndarray, R: int, rng: np.random.Generator, dtype=np.int64):
+    """
+    Exact survivor counts at arbitrary sorted times ``t`` for R realizations.
+
+    Two strategies, both exact in distribution, picking the cheaper one:
+    - N0 <= len(t): draw every nucleus' exponential decay time and count how
+      many fall after each output time (cost ~ R*N0, no time loop at all);
+    - otherwise: jump between consecutive output times with
+      N <- Binomial(N, exp(-lam*gap)) and stop once every realization is empty
+      (cost ~ R*len(t)).
+
+    The counts are written straight into a ``dtype`` array (int64 by default).
+    """
+    t = np.asarray(t, dtype=float)
+    if t.ndim != 1 or t.size == 0:
+        raise ValueError("t must be a non-empty 1-D array")
+    if t[0] < 0 or np.any(np.diff(t) < 0):
+        raise ValueError("t must be sorted and non-negative")
+
+    steps = t.size
+    traj = np.empty((R, steps), dtype=dtype)
+    if lam <= 0 or N0 == 0:
+        traj[:] = N0
+        return traj
+
+    if N0 <= steps:
+        rows = max(1, _EXACT_CHUNK // N0)
+        for r0 in range(0, R, rows):
+            r1 = min(R, r0 + rows)
+            times = rng.exponential(1.0 / lam, size=(r1 - r0, N0))
+            # a nucleus is alive at t[k] iff its decay time is > t[k], i.e. iff b > k
+            b = np.searchsorted(t, times, side="left")
+            b += (np.arange(r1 - r0) * (steps + 1))[:, None]
+            hist = np.bincount(b.ravel(), minlength=(r1 - r0) * (steps + 1)).reshape(r1 - r0, steps + 1)
+            traj[r0:r1] = N0 - np.cumsum(hist[:, :-1], axis=1)
+        return traj
+
+    q = np.exp(-lam * np.diff(t, prepend=0.0))   # survival probability over each gap
+    N = np.full(R, N0, dtype=np.int64)
+    for k in range(steps):
+        if not N.any():
+            traj[:, k:] = 0
+            break
+        if q[k] < 1.0:
+            N = rng.binomial(N, q[k])
+        traj[:, k] = N
     return traj
 
+
+def _simulate_adaptive(N0: int, lam: float, t: np.ndarray, R: int, rng: np.random.Generator, tol: float = 1.0):
+    """
+    Adaptive-step binomial engine on the output grid ``t`` (any sorted grid).
+
+    A binomial jump N <- Binomial(N, exp(-lam*h)) is exact in distribution for
+    any h, so the step only matters for the output points it skips. Those get
+    the conditional mean given both ends: of the D nuclei that decayed in the
+    jump, a fraction pi(t) is still alive at t, with error variance
+    D*pi*(1-pi) <= D/4. Each jump is therefore the longest one (snapped to
+    grid points) whose expected decay count, for the fullest realization,
+    is at most 4*tol**2, so skipped points have a standard deviation of at
+    most ~tol nuclei: every point while decays are dense, long jumps in the
+    tail. The mean curve is unbiased at every point.
+
+    Returns
+    -------
+    traj : np.ndarray
+        Shape (R, len(t)), float (interpolated points are not integers).
+    n_steps : int
+        Number of binomial draws (jumps) taken.
+    """
+    t = np.asarray(t, dtype=float)
+    if t.ndim != 1 or t.size == 0 or t[0] < 0 or np.any(np.diff(t) < 0):
+        raise ValueError("t must be a sorted, non-negative 1-D array")
+    if tol <= 0:
+        raise ValueError("tol must be positive")
+    traj = np.empty((R, t.size), dtype=np.float64)
+    N = np.full(R, N0, dtype=np.int64)
+    traj[:, 0] = N
+    budget = 4.0 * tol * tol
+    i, n_steps = 0, 0
+    while i < t.size - 1:
+        n_max = N.max()
+        if n_max == 0 or lam <= 0:
+            traj[:, i + 1:] = N[:, None]
+            break
+        # longest jump from t[i] with n_max * (1 - exp(-lam*h)) <= budget (at least one point)
+        h_max = -np.log1p(-min(budget / n_max, 1.0)) / lam if budget < n_max else np.inf
+        j = max(i + 1, int(np.searchsorted(t, t[i] + h_max, side="right")) - 1)
+        j = min(j, t.size - 1)
+        q = np.exp(-lam * (t[j] - t[i]))
+        N_next = rng.binomial(N, q)
+        n_steps += 1
+        if j > i + 1:
+            # survival of a nucleus that decayed within (t[i], t[j]] beyond each skipped point
+            tt = t[i + 1:j] - t[i]
+            pi = (np.exp(-lam * tt) - q) / (1.0 - q)
+            traj[:, i + 1:j] = N_next[:, None] + (N - N_next)[:, None] * pi
+        traj[:, j] = N_next
+        N, i = N_next, j
+    return traj, n_steps
+
+
 # --- saving helper (append at file bottom) ---
-def _save_run(arrays: dict, meta: dict):
+def _save_run(arrays: dict, meta: dict, cfg: Optional[SimConfig] = None):
+    from .runstore import save_run
+    if cfg is None:
+        return save_run(arrays, meta)
+    return save_run(arrays, meta, fmt=cfg.store, csv=cfg.csv, count_dtype=cfg.count_dtype, encoding=cfg.encoding)
+
+
+def simulate_to_store(iso: Isotope, cfg: SimConfig, rng: np.random.Generator, chunk_steps: int = 1024):
+    """
+    Binomial engine that appends traj to a "chunked" run while it simulates.
+
+    Only an (R x chunk_steps) buffer is held in memory. Same RNG sequence as
+    engine="binomial", so the stored traj equals simulate_isotope's.
+    Returns (t, N_mean, run_dir).
+    """
+    from .runstore import RunWriter, count_dtype_for
+
+    t = np.arange(0, cfg.T + cfg.dt, cfg.dt)
+    p = step_probability(iso.lam, cfg.dt)
+    steps = t.size
+    R = cfg.n_realizations
+    writer = RunWriter({"mode": cfg.engine, "n0": iso.N0, "lambda": iso.lam, "tmax": float(t[-1]),
+                        "dt": cfg.dt, "n_realizations": R})
+
+    buf = np.empty((R, min(chunk_steps, steps)), dtype=count_dtype_for(iso.N0, cfg.count_dtype))
+    N_mean = np.empty(steps)
+    N = np.full(R, iso.N0, dtype=np.int64)
+    # "simulate" here includes the block writes, which are also timed as "save"
+    with instrument.phase("simulate"):
+        for k in range(steps):
+            if k:
+                N = N - rng.binomial(N, p)
+            j = k % buf.shape[1]
+            buf[:, j] = N
+            N_mean[k] = N.mean()
+            if j == buf.shape[1] - 1 or k == steps - 1:
+                writer.append("traj", buf[:, :j + 1])
+    instrument.count("rng_calls", steps - 1)
+    instrument.count("rng_variates", R * (steps - 1))
+    writer.write("t", t)
+    writer.write("N", N_mean)
+    writer.write("N_last", N)
+    return t, N_mean, writer.close()
+
+
+def run_deterministic(iso: Isotope, t, cfg: Optional[SimConfig] = None, meta=None):
+    """
+    Analytical N(t) and A(t) on the grid t (any grid), saved without traj.
+
+    No random numbers and no realizations: the curve is evaluated in one
+    broadcast (decay.decay_table). Returns (t, N, run_dir); run_dir is None
+    unless cfg.save.
+    """
+    t = np.asarray(t, dtype=float)
+    N, A = decay_table(iso.N0, iso.lam, t)
+    run_dir = None
+    if cfg is not None and cfg.save:
+        run_dir = _save_run(
+            {"t": t, "N": N, "A": A},
+            {"mode": "deterministic", "n0": iso.N0, "lambda": iso.lam, "tmax": float(t[-1]), "dt": cfg.dt,
+             "n_realizations": 1, **(meta or {})},
+            cfg,
+        )
+    return t, N, run_dir
+
+
+def run(lam: float, n0: int = 10000, tmax: float = 10.0, dt: float = 0.05, seed=None,
+        realizations: int = 20, engine: str = "binomial", workers: int = 1, mode: str = "mc",
+        meta=None, store: str = "npy", csv: bool = False, save: bool = True, cache: bool = True,
+        t_eval=None, tol: float = 1.0, encoding=None):
+    """
+    Simulate one isotope, save the run and return (t, traj, run_dir).
+
+    This is the in-process entry point used by the CLI; `meta` entries
+    (e.g. the time unit) are written into meta.json together with the run.
+    With save=False nothing is written and run_dir is None. For
+    store="chunked" the binomial engine streams traj to disk and traj is
+    returned as None (use N = mean from the run, or load it back).
+
+    mode="deterministic" skips the MC machinery: traj is the analytical
+    curve as a single row and only t, N and A are saved. t_eval sets the
+    output times (any grid) for the deterministic mode and the exact and
+    adaptive engines; tol is the adaptive engine's error tolerance.
+    encoding ("tail" or "delta") compacts the saved traj further.
+
+    Seeded, saved runs go through the result cache (src.cache): an identical
+    request returns the existing run directory without simulating.
+    """
+    if encoding is not None and store == "chunked":
+        raise ValueError("traj encodings apply to the npy and npz stores, not chunked")
+    iso = Isotope("X", N0=n0, lam=lam)
+    cfg = SimConfig(dt=dt, T=tmax, n_realizations=realizations, engine=engine, t_eval=t_eval,
+                    tol=tol, save=False, store=store, csv=csv, encoding=encoding)
+    if mode == "deterministic":
+        t = np.arange(0, tmax + dt, dt) if t_eval is None else t_eval
+        t, N, run_dir = run_deterministic(iso, t, replace(cfg, save=save), meta)
+        return t, N[None], run_dir
+    meta = {"seed": seed, "workers": workers, **(meta or {})}
+    # traj goes straight to disk (returned as None), whether simulated now or found in the cache
+    streamed = save and store == "chunked" and engine == "binomial" and workers == 1
+
+    key = params = None
+    if cache and save and seed is not None:
+        from . import cache as _cache
+        params = cache_params(iso, cfg, mode, meta)
+        key = _cache.cache_key(params)
+        with instrument.phase("cache.lookup"):
+            run_dir = _cache.lookup(key)
+        if run_dir is not None:
+            from .runreader import has_array, load_array
+            traj = load_array(run_dir, "traj") if has_array(run_dir, "traj") and not streamed else None
+            return load_array(run_dir, "t"), traj, run_dir
+
+    # binomial runs are checkpointed (generator states + N_last) so src.resume can extend them
+    from .resume import checkpoint
+    root = np.random.SeedSequence(seed)   # default_rng(root) == default_rng(seed); keeps drawn entropy
+    traj = None
+    if streamed:
+        rng = np.random.default_rng(root)
+        t, N_mean, run_dir = simulate_to_store(iso, cfg, rng)
+        _update_meta(run_dir, dict(meta, checkpoint=checkpoint(
+            root.entropy, [(realizations, (), rng.bit_generator.state)])))
+        _cache_store(key, run_dir, params)
+        return t, traj, run_dir
+
+    if workers > 1:
+        from .parallel import shard_sizes, simulate_parallel
+        with instrument.phase("simulate"):
+            t, traj, states = simulate_parallel(iso, cfg, seed=root.entropy, workers=workers, return_states=True)
+        blocks = [(n, (i,), st) for i, (n, st) in enumerate(zip(shard_sizes(realizations, workers), states))]
+    else:
+        rng = np.random.default_rng(root)
+        t, traj = simulate_isotope(iso, cfg, rng)
+        blocks = [(realizations, (), rng.bit_generator.state)]
+    run_dir = None
+    if save:
+        arrays = {"t": t, "N": traj.mean(axis=0), "traj": traj}
+        if engine == "binomial":
+            arrays["N_last"] = traj[:, -1].astype(np.int64)
+            meta = dict(meta, checkpoint=checkpoint(root.entropy, blocks))
+        run_dir = _save_run(
+            arrays,
+            {"mode": engine, "n0": iso.N0, "lambda": iso.lam, "tmax": float(t[-1]), "dt": dt,
+             "n_realizations": realizations, **meta},
+            cfg,
+        )
+        _cache_store(key, run_dir, params)
+    return t, traj, run_dir
+
+
+def cache_params(iso: Isotope, cfg: SimConfig, mode: str = "mc", meta=None) -> dict:
+    """Everything that determines a run's numbers (meta holds seed, workers, unit, ...); hashed by src.cache."""
+    params = {"n0": iso.N0, "lambda": iso.lam, "dt": cfg.dt, "tmax": cfg.T, "realizations": cfg.n_realizations,
+              "engine": cfg.engine, "mode": mode, "store": cfg.store, "csv": cfg.csv, **(meta or {})}
+    if cfg.t_eval is not None:
+        params["t_eval"] = np.asarray(cfg.t_eval, dtype=float).tolist()
+    if cfg.engine == "adaptive":
+        params["tol"] = cfg.tol
+    if cfg.encoding is not None:
+        params["encoding"] = cfg.encoding
+    return params
+
+
+def _cache_store(key, run_dir, params):
+    if key is None:
+        return
+    from . import cache as _cache
+    _cache.record(key, run_dir, params)
+    max_runs, max_bytes = _cache.limits_from_env()
+    if max_runs is not None or max_bytes is not None:
+        _cache.evict(max_runs, max_bytes)
+
+
+def _update_meta(run_dir, extra: dict):
+    import json
     from pathlib import Path
-    import numpy as np, json, time
-
-    out_root = Path("data/runs")
-    out_root.mkdir(parents=True, exist_ok=True)
-    run_dir = out_root / time.strftime("run_%Y%m%d-%H%M%S")
-    run_dir.mkdir(parents=True, exist_ok=True)
-
-    for k, v in arrays.items():
-        v = np.asarray(v)
-        np.save(run_dir / f"{k}.npy", v)
-        np.savetxt(run_dir / f"{k}.csv", v, delimiter=",")
-
-    (run_dir / "meta.json").write_text(json.dumps(meta, indent=2))
-
-    # update 'last' symlink
-    last = out_root / "last"
-    try:
-        if last.exists() or last.is_symlink():
-            last.unlink()
-        last.symlink_to(run_dir.resolve())
-    except Exception:
-        pass  # e.g., Windows without symlink perms
-
-    print(f"[OK] Saved results to: {run_dir}")
+    path = Path(run_dir) / "meta.json"
+    meta = json.loads(path.read_text())
+    meta.update(extra)
+    path.write_text(json.dumps(meta, indent=2))
+
+
+def main():
+    import argparse
+    ap = argparse.ArgumentParser(description="Run a single-isotope Monte Carlo simulation and save it")
+    ap.add_argument("--mode", choices=["deterministic", "mc"], default="mc")
+    ap.add_argument("--n0", type=int, default=10000)
+    ap.add_argument("--lambda", type=float, dest="lambda_", required=True)
+    ap.add_argument("--tmax", type=float, default=10.0)
+    ap.add_argument("--dt", type=float, default=0.05)
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--realizations", type=int, default=20)
+    ap.add_argument("--engine", choices=["binomial", "per_nucleus", "numba", "exact", "adaptive"], default="binomial")
+    ap.add_argument("--tol", type=float, default=1.0, help="Adaptive engine: max std (nuclei) of interpolated points")
+    ap.add_argument("--workers", type=int, default=1, help="Processes to shard realizations over")
+    ap.add_argument("--store", choices=["npy", "npz", "chunked"], default="npy")
+    ap.add_argument("--csv", action="store_true", help="Also export CSV copies of the arrays")
+    ap.add_argument("--encoding", choices=["tail", "delta"], help="Compact encoding of the saved traj")
+    ap.add_argument("--t-eval", type=float, nargs="+",
+                    help="Output times, any grid (deterministic mode, exact and adaptive engines)")
+    args = ap.parse_args()
+
+    run(args.lambda_, n0=args.n0, tmax=args.tmax, dt=args.dt, seed=args.seed, realizations=args.realizations,
+        engine=args.engine, workers=args.workers, mode=args.mode, store=args.store, csv=args.csv,
+        t_eval=args.t_eval, tol=args.tol, encoding=args.encoding)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import csv
+from src.batch import expand, run_batch
+
+
+def test_grid_expansion_and_isotope_keys():
+    doc = {"run_name": "g", "isotopes": [{"name": "A", "lambda": 1.0, "N0": 10}, {"name": "B", "lambda": 2.0, "N0": 20}],
+           "grid": {"dt": [0.1, 0.2], "isotopes.N0": [5, 50]}}
+    configs = expand(doc)
+    assert len(configs) == 4
+    assert [i["N0"] for i in configs[1]["isotopes"]] == [50, 50]
+    assert configs[0]["monte_carlo"]["engine"] == "binomial"     # defaults filled in
+    assert configs[3]["label"] == "g[dt=0.2][isotopes.N0=50]"
+
+
+def test_batch_dedups_caches_and_summarises(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "exp.yaml").write_text(
+        "run_name: demo\nrandom_seed: 3\ndt: 0.1\nT: 5.0\n"
+        "isotopes:\n  - {name: X, half_life: 1.0, N0: 2000}\n"
+        "monte_carlo: {n_realizations: 50, engine: binomial}\n"
+        "grid:\n  monte_carlo.engine: [binomial, exact, binomial]\n")
+    rows = run_batch(["exp.yaml"], out="summary.csv")
+    assert [r["engine"] for r in rows] == ["binomial", "exact"]
+    assert rows[0]["duplicates"] == 1 and not rows[0]["cached"]
+    assert all(abs(r["half_life_hat"] - 1.0) < 5 * r["half_life_se"] for r in rows)
+    with open("summary.csv") as f:
+        assert len(list(csv.DictReader(f))) == 2
+
+    again = run_batch(["exp.yaml"], out="summary2.csv")
+    assert all(r["cached"] for r in again)
+    assert [r["run_dir"] for r in again] == [r["run_dir"] for r in rows]
@@ -0,0 +1,26 @@
+import os
+import pytest
+from src import bench
+
+
+def test_measure_separates_warmup_and_compare_flags_slowdowns():
+    calls = []
+    case = bench.Case("demo", "unit", {}, lambda: (lambda: calls.append(1)))
+    res = bench.measure(case, warmup=2, repeat=3)
+    assert len(calls) == 2 + 3 + 1          # warm-up, timed, traced
+    assert len(res["warmup_s"]) == 2 and res["min_s"] <= res["median_s"]
+
+    base = {"results": [{"name": "a", "min_s": 0.010}, {"name": "b", "min_s": 0.010}]}
+    cur = {"results": [{"name": "a", "min_s": 0.020}, {"name": "b", "min_s": 0.011}, {"name": "c", "min_s": 1.0}]}
+    assert bench.compare(cur, base, tolerance=0.3) == [("a", 0.010, 0.020)]
+
+
+@pytest.mark.bench
+def test_quick_grid_has_no_regressions():
+    """`pytest -m bench`: the quick grid must stay within tolerance of the stored baseline."""
+    if not bench.BASELINE.exists():
+        pytest.skip("no baseline; create one with `raddecay bench --save-baseline`")
+    tolerance = float(os.environ.get("RADDECAY_BENCH_TOLERANCE", "0.5"))
+    report = bench.run_bench("quick", quiet=True)
+    slow = bench.compare(report, bench.load_json(bench.BASELINE), tolerance)
+    assert not slow, "\n".join(f"{n}: {b * 1e3:.2f} ms -> {c * 1e3:.2f} ms" for n, b, c in slow)
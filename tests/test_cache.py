@@ -0,0 +1,52 @@
+from pathlib import Path
+import numpy as np
+from src import cache
+from src.runstore import new_run_dir
+from src.simulate import run
+
+
+def test_seeded_run_is_cached_and_evicted_lru(monkeypatch, tmp_path):
+    """
+    A repeated seeded run returns the cached directory, a changed parameter
+    misses, and eviction drops the least recently used run but never `last`.
+    """
+    monkeypatch.chdir(tmp_path)
+    t, traj, first = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=7, realizations=4)
+    _, again, hit = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=7, realizations=4)
+    assert hit == first and np.array_equal(again, traj)
+
+    _, _, other = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=8, realizations=4)
+    assert other != first
+    run(0.2, n0=500, tmax=2.0, dt=0.1, seed=7, realizations=4)       # touch `first`, last -> first
+
+    removed = cache.evict(max_runs=1)
+    assert removed == [other]
+    assert cache.lookup(cache.cache_key({"missing": True})) is None
+    assert (tmp_path / first / "meta.json").exists()
+
+
+def test_eviction_keeps_uncached_runs(monkeypatch, tmp_path):
+    """Unseeded (never cached) runs are not listed and survive `cache clear`."""
+    monkeypatch.chdir(tmp_path)
+    _, _, cached = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=7, realizations=4)
+    _, _, unseeded = run(0.2, n0=500, tmax=2.0, dt=0.1, realizations=4)
+    assert [d for d, _, _ in cache.list_runs()] == [Path(cached)]
+
+    run(0.2, n0=500, tmax=2.0, dt=0.1, realizations=4)            # last -> another uncached run
+    assert cache.evict(max_runs=0) == [Path(cached)]
+    assert (tmp_path / unseeded / "meta.json").exists()
+
+
+def test_cache_hit_returns_what_a_miss_returns(monkeypatch, tmp_path):
+    """A cached chunked run comes back as (t, None, run_dir), like the run that wrote it."""
+    from src.runreader import load_array
+    monkeypatch.chdir(tmp_path)
+    t, traj, first = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=3, realizations=4, store="chunked")
+    t_hit, traj_hit, hit = run(0.2, n0=500, tmax=2.0, dt=0.1, seed=3, realizations=4, store="chunked")
+    assert hit == first and traj is None and traj_hit is None
+    assert np.array_equal(t_hit, t) and load_array(hit, "traj").shape == (4, t.size)
+
+
+def test_run_dirs_in_the_same_second_do_not_collide(tmp_path):
+    dirs = {new_run_dir(tmp_path) for _ in range(3)}
+    assert len(dirs) == 3
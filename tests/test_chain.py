@@ -0,0 +1,59 @@
+import numpy as np
+from src.chain import CHAINS, Chain, bateman, catalogue_chain, simulate_chain
+from src.presets import LAMBDA, PRESETS, chain_members, lambda_in_unit_from_half_life, preset_lambda
+
+
+def test_bateman_matches_two_member_closed_form():
+    """
+    The matrix solver reproduces the A→B formulas in docs/chain.md,
+    including the equal-λ limit.
+    """
+    t = np.linspace(0, 20, 1001)
+    la, lb, n0 = 0.2, 0.05, 50000
+    N = bateman(Chain.linear("AB", (la, lb)), [n0, 0], t)
+    NB = la * n0 / (lb - la) * (np.exp(-la * t) - np.exp(-lb * t))
+    assert np.allclose(N[0], n0 * np.exp(-la * t))
+    assert np.allclose(N[1], NB)
+
+    N = bateman(Chain.linear("AB", (la, la)), [n0, 0], t)
+    assert np.allclose(N[1], la * n0 * t * np.exp(-la * t), rtol=1e-6, atol=1e-6)
+
+
+def test_chain_mc_mean_follows_bateman_for_ten_members():
+    """
+    Ten members advance in one multinomial draw per step; the MC mean
+    tracks the deterministic solution and nuclei are conserved.
+    """
+    lam = np.linspace(0.5, 0.05, 10)
+    chain = Chain.linear([f"X{i}" for i in range(10)], lam)
+    n0 = np.zeros(10, dtype=np.int64)
+    n0[0] = 100000
+    res = simulate_chain(chain, n0, dt=0.5, T=20.0, n_realizations=20, rng=np.random.default_rng(0))
+
+    assert res.dims == ("realization", "nuclide", "time")
+    assert res.traj.shape == (20, 10, 41)
+    assert np.all(res.traj.sum(axis=1) <= n0.sum())
+    theory = bateman(chain, n0, res.t[0])
+    big = theory > 2000
+    assert np.allclose(res.mean()[big], theory[big], rtol=0.05)
+
+
+def test_catalogue_lambdas_and_chain_are_precomputed_once():
+    """
+    Catalogue λ equal the half-life conversion in every unit; preset chains
+    are shared per unit and reuse their transition matrix per dt.
+    """
+    for key, (unit, hl) in PRESETS.items():
+        for u in LAMBDA[key]:
+            assert LAMBDA[key][u] == lambda_in_unit_from_half_life(hl, unit, u)
+    assert preset_lambda("i131") == LAMBDA["i131"]["d"]
+    assert chain_members("mo99") == ["mo99", "tc99m"]
+
+    chain = catalogue_chain("mo99", "h")
+    assert chain is CHAINS["mo99-tc99m"] and catalogue_chain("mo99", "d") is not chain
+    assert chain.names == ("Mo-99", "Tc-99m") and chain.branching[0, 1] == 0.876
+    assert np.allclose(chain.lam, np.log(2) / np.array([66.0, 6.01]))
+    P = chain.transition_matrix(0.5)
+    assert chain.transition_matrix(0.5) is P and not P.flags.writeable
+    assert np.allclose(P.sum(axis=1), 1.0)
+    assert np.allclose(catalogue_chain("mo99", "d").transition_matrix(0.5 / 24), P)
@@ -0,0 +1,32 @@
+import json
+import sys
+from src import cli
+
+
+def test_pipeline_runs_in_process(monkeypatch, tmp_path):
+    """
+    `pipeline` simulates, fits and plots in one process, recording the
+    time unit in meta.json and λ̂ in fit.json.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["raddecay", "pipeline", "--lambda", "0.2", "--n0", "2000",
+                                      "--tmax", "20", "--dt", "0.1", "--seed", "1",
+                                      "--half-life-unit", "min", "--out", "img"])
+    cli.main()
+
+    last = tmp_path / "data" / "runs" / "last"
+    assert json.loads((last / "meta.json").read_text())["unit"] == "min"
+    assert abs(json.loads((last / "fit.json").read_text())["lambda_hat"] - 0.2) < 0.01
+    assert (tmp_path / "img" / "nt_curve.png").exists()
+    assert (tmp_path / "img" / "log_fit.png").exists()
+
+
+def test_chunked_store_with_encoding_is_a_usage_error(monkeypatch, tmp_path, capsys):
+    import pytest
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", ["raddecay", "simulate", "--lambda", "0.2", "--n0", "100",
+                                      "--store", "chunked", "--encoding", "tail"])
+    with pytest.raises(SystemExit) as exc:
+        cli.main()
+    assert exc.value.code == 2 and "--encoding needs --store npy or npz" in capsys.readouterr().err
+    assert not (tmp_path / "data").exists()
@@ -0,0 +1,72 @@
+import json
+import numpy as np
+from src.detector import DetectorModel, fit_detector
+
+
+def test_joint_fit_recovers_decay_and_background():
+    """
+    1000 detector series (efficiency, dead time, background) fitted in one
+    call: (N0, λ, bg) are unbiased and the λ standard error is not optimistic.
+    """
+    rng = np.random.default_rng(5)
+    t = np.arange(0.0, 15.0 + 1e-9, 0.1)
+    R, lam = 1000, 0.5
+    N = np.full(R, 8000)
+    traj = [N]
+    for _ in t[1:]:
+        N = N - rng.binomial(N, -np.expm1(-lam * 0.1))
+        traj.append(N)
+    traj = np.stack(traj, axis=1)
+
+    det = DetectorModel(efficiency=0.3, dead_time=2e-4, bg_rate=4.0)
+    counts = det.measure(t, traj, rng)
+    assert counts.shape == (R, t.size - 1)
+
+    fit = fit_detector(t, counts, det)
+    assert fit.converged.all()
+    for est, true in ((fit.lam, lam), (fit.N0, 8000), (fit.bg, 4.0)):
+        assert abs(est.mean() - true) < 4 * est.std() / np.sqrt(R)
+    assert fit.se[:, 1].mean() > 0.9 * fit.lam.std()
+    assert np.allclose(det.expected(t, 8000, lam)[:3], counts[:, :3].mean(axis=0), rtol=0.05)
+
+
+def test_bg_stage_writes_detector_fit(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    from src.plot_with_bg import measure_run
+    from src.simulate import run
+    run(0.4, n0=3000, tmax=15.0, dt=0.1, seed=2, realizations=50)
+    rep = measure_run("data/runs/last", DetectorModel(0.5, 0.0, 2.0), seed=1, out="img")
+    assert np.load("data/runs/last/measured.npy").shape == (50, 150)
+    assert abs(rep["lambda_hat"] - 0.4) < 4 * rep["lambda_se"]
+    assert json.loads(open("data/runs/last/fit.json").read())["detector"]["n_series"] == 50
+    assert (tmp_path / "img" / "measured_counts.png").exists()
+
+
+def test_bg_stage_reports_when_no_series_converges(monkeypatch, tmp_path):
+    import dataclasses
+    import pytest
+    from src import plot_with_bg
+    from src.simulate import run
+    monkeypatch.chdir(tmp_path)
+    run(0.4, n0=3000, tmax=5.0, dt=0.1, seed=2, realizations=4)
+    real = plot_with_bg.fit_detector
+    monkeypatch.setattr(plot_with_bg, "fit_detector",
+                        lambda *a: dataclasses.replace(real(*a), converged=np.zeros(4, dtype=bool)))
+    with pytest.raises(SystemExit, match="no series could be fitted"):
+        plot_with_bg.measure_run("data/runs/last", DetectorModel(0.5, 0.0, 2.0), seed=1, out="img")
+
+
+def test_bg_stage_skips_detector_on_non_uniform_grid(monkeypatch, tmp_path, capsys):
+    """Runs saved on a --t-eval grid still get the background plots; the detector stage is skipped."""
+    monkeypatch.chdir(tmp_path)
+    import sys
+    from src import cli
+    monkeypatch.setattr(sys, "argv", ["raddecay", "simulate", "--mode", "mc", "--engine", "exact", "--lambda", "0.3",
+                                      "--n0", "1000", "--realizations", "5", "--seed", "1",
+                                      "--t-eval", "0", "0.5", "1", "3", "7", "10"])
+    cli.main()
+    monkeypatch.setattr(sys, "argv", ["raddecay", "bg", "--bg-rate", "2", "--out", "img"])
+    cli.main()
+    assert "not uniform" in capsys.readouterr().err
+    assert (tmp_path / "img" / "nt_curve_bg.png").exists()
+    assert not (tmp_path / "data" / "runs" / "last" / "measured.npy").exists()
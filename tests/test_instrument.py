@@ -0,0 +1,29 @@
+import json
+from src import instrument
+
+
+def test_disabled_is_a_shared_noop():
+    instrument.reset()
+    assert not instrument.enabled()
+    assert instrument.phase("x") is instrument.phase("y")     # one shared nullcontext, no allocation
+    with instrument.phase("x"):
+        instrument.count("n", 5)
+    assert instrument.snapshot() == {"timers_s": {}, "counters": {}}
+
+
+def test_timings_are_appended_to_meta(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    from src.simulate import run
+    instrument.reset()
+    instrument.enable()
+    try:
+        _, _, run_dir = run(0.5, n0=1000, tmax=5.0, dt=0.1, seed=1, realizations=30)
+        rec = instrument.report(run_dir, command="simulate")
+    finally:
+        instrument.enable(False)
+        instrument.reset()
+    assert {"simulate", "save"} <= set(rec["timers_s"])
+    assert rec["counters"]["rng_calls"] == 50 and rec["counters"]["rng_variates"] == 30 * 50
+    assert rec["counters"]["bytes_written"] > 30 * 51 * 2       # traj is saved as uint16 for N0 < 65536
+    meta = json.loads((run_dir / "meta.json").read_text())
+    assert meta["timing"][-1]["command"] == "simulate"
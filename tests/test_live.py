@@ -0,0 +1,51 @@
+import asyncio
+import numpy as np
+from src.analysis import fit_lambda_poisson
+from src.detector import DetectorModel
+from src.live import OnlineDecayFit, acquire, live_estimates, replayed_counts, simulated_counts
+
+
+def test_online_fit_equals_batch_poisson_mle():
+    """After every bin the recursive estimate is the Poisson MLE on all bins so far."""
+    bins = list(simulated_counts(50000, 0.4, 0.1, rng=3, tmax=8.0))
+    t = np.array([b[0] for b in bins]) + 2.0          # acquisition starting at t0 = 2
+    y = np.array([b[1] for b in bins], dtype=float)
+    fit = OnlineDecayFit(0.1, t0=2.0)
+    for k, count in enumerate(y, start=1):
+        est = fit.update(count)
+        if k in (5, 20, len(y)):
+            ref = fit_lambda_poisson(t[:k], y[:k])
+            assert np.isclose(est.lam, ref.lam, rtol=1e-8) and np.isclose(est.lam_se, ref.se, rtol=1e-6)
+            assert np.isclose(est.N0 * -np.expm1(-est.lam * 0.1), ref.N0, rtol=1e-6)
+
+
+def test_live_stream_with_detector_and_replay(monkeypatch, tmp_path):
+    det = DetectorModel(efficiency=0.5, dead_time=1e-5, bg_rate=3.0)
+
+    async def collect(source, t0=0.0):
+        return [e async for e in live_estimates(acquire(source), 0.1, t0, det, every=10)]
+
+    ests = asyncio.run(collect(simulated_counts(200000, 0.3, 0.1, det, rng=1, tmax=10.0)))
+    assert [e.n_bins for e in ests][-1] == 100 and all(e.latency >= 0 for e in ests)
+    assert abs(ests[-1].lam - 0.3) < 4 * ests[-1].lam_se
+
+    monkeypatch.chdir(tmp_path)
+    from src.simulate import run
+    _, traj, run_dir = run(0.3, n0=20000, tmax=10.0, dt=0.1, seed=2, realizations=3)
+    bins = list(replayed_counts(run_dir, series=1))
+    assert [c for _, c in bins] == (-np.diff(traj[1].astype(int))).tolist()
+    est = asyncio.run(collect(bins))[-1]
+    assert est.n_bins == len(bins) and est.counts > 0
+
+
+def test_replay_of_npz_run_uses_bg_measured_counts(monkeypatch, tmp_path):
+    """measured.npy written by bg next to a run.npz is found and replayed instead of the raw decays."""
+    from src.plot_with_bg import measure_run
+    from src.runreader import list_arrays
+    from src.simulate import run
+    monkeypatch.chdir(tmp_path)
+    _, _, run_dir = run(0.3, n0=20000, tmax=10.0, dt=0.1, seed=2, realizations=3, store="npz")
+    measure_run(run_dir, DetectorModel(0.5, 0.0, 3.0), seed=1, out="img")
+    assert "measured" in list_arrays(run_dir) and "traj" in list_arrays(run_dir)
+    measured = np.load(run_dir / "measured.npy")
+    assert [c for _, c in replayed_counts(run_dir, series=2)] == measured[2].tolist()
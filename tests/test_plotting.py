@@ -0,0 +1,22 @@
+import numpy as np
+from src.plotting import decimate, render_runs
+
+
+def test_decimate_keeps_extremes_and_endpoints():
+    t = np.arange(100_000, dtype=float)
+    y = np.sin(t / 500.0)
+    y[12_345] = 10.0
+    td, yd = decimate(t, y, max_points=400)
+    assert td.size <= 402 and np.all(np.diff(td) > 0)
+    assert yd.max() == 10.0 and yd.min() == y.min()
+    assert td[0] == 0 and td[-1] == t[-1]
+    assert decimate(t[:50], y[:50], max_points=400)[0].size == 50
+
+
+def test_render_runs_reuses_figures_per_worker(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    from src.simulate import run
+    dirs = [run(0.3, n0=500, tmax=5.0, dt=0.1, seed=s, realizations=5, cache=False)[2] for s in range(3)]
+    paths = render_runs(dirs, "figs", workers=2, dpi=50)
+    assert [p[0] for p in paths] == [f"figs/{d.resolve().name}/nt_curve.png" for d in dirs]
+    assert all((tmp_path / p).stat().st_size > 0 for pair in paths for p in pair)
@@ -0,0 +1,36 @@
+import numpy as np
+from src.resume import extend_run
+from src.runreader import load_array
+from src.simulate import run
+
+
+def test_time_extension_equals_one_longer_run(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    _, short, first = run(0.3, n0=4000, tmax=5.0, dt=0.1, seed=11, realizations=25, cache=False)
+    t, traj, ext = extend_run(first, tmax=12.0, quiet=True)
+    t_ref, ref, _ = run(0.3, n0=4000, tmax=12.0, dt=0.1, seed=11, realizations=25, cache=False)
+    assert np.array_equal(t, t_ref) and np.array_equal(traj, ref)
+    assert np.array_equal(load_array(ext, "traj"), ref)
+    assert np.array_equal(load_array(first, "traj"), short)     # the original run is untouched
+
+    # extending the extension again continues from its own checkpoint
+    _, again, _ = extend_run(ext, tmax=15.0, quiet=True)
+    _, ref15, _ = run(0.3, n0=4000, tmax=15.0, dt=0.1, seed=11, realizations=25, cache=False)
+    assert np.array_equal(again, ref15)
+
+
+def test_appended_realizations_equal_one_more_shard(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    _, _, first = run(0.5, n0=2000, tmax=4.0, dt=0.1, seed=5, realizations=20, workers=2, cache=False)
+    _, traj, _ = extend_run(first, tmax=6.0, add_realizations=10, quiet=True)
+    _, ref, _ = run(0.5, n0=2000, tmax=6.0, dt=0.1, seed=5, realizations=30, workers=3, cache=False)
+    assert traj.shape == (30, ref.shape[1]) and np.array_equal(traj, ref)
+
+
+def test_extended_run_is_not_labelled_with_the_original_cache_key(monkeypatch, tmp_path):
+    import json
+    monkeypatch.chdir(tmp_path)
+    _, _, first = run(0.3, n0=1000, tmax=2.0, dt=0.1, seed=4, realizations=5)
+    _, _, ext = extend_run(first, tmax=3.0, quiet=True)
+    assert "cache_key" in json.loads((first / "meta.json").read_text())
+    assert "cache_key" not in json.loads((ext / "meta.json").read_text())
@@ -0,0 +1,104 @@
+import numpy as np
+from src.decay import Isotope
+from src.runreader import load_array
+from src.runstore import save_run
+from src.simulate import SimConfig, simulate_isotope, simulate_to_store
+
+
+def test_formats_round_trip_with_compact_counts(tmp_path):
+    """
+    npy, npz and chunked runs load back the same arrays; traj is stored as
+    uint16 and loaded back as signed int32.
+    """
+    import json
+    t = np.arange(5.0)
+    traj = np.array([[10, 8, 5, 5, 1], [10, 9, 7, 3, 0]], dtype=float)
+    for fmt in ("npy", "npz", "chunked"):
+        run_dir = save_run({"t": t, "traj": traj}, {}, fmt=fmt, root=tmp_path / fmt, chunk_steps=2, quiet=True)
+        back = load_array(run_dir, "traj")
+        assert json.loads((run_dir / "meta.json").read_text())["store"]["dtypes"]["traj"] == "uint16"
+        assert back.dtype == np.int32 and np.array_equal(back, traj)
+        assert np.array_equal(load_array(run_dir, "t"), t)
+        assert not list(run_dir.glob("*.csv"))
+
+
+def test_count_encodings_round_trip(tmp_path):
+    """
+    tail and delta encodings shrink traj on disk and decode to the same counts;
+    non-integer arrays are never downcast.
+    """
+    from src.runstore import count_dtype_for
+    assert [count_dtype_for(n) for n in (1000, 70000, 2**40)] == [np.uint16, np.int32, np.int64]
+    assert count_dtype_for(1000, "int32") == np.int32
+
+    t = np.arange(1000.0)
+    traj = np.maximum(np.array([[300], [280]]) - 3 * np.arange(1000), 0)
+    plain = save_run({"t": t, "traj": traj}, {}, root=tmp_path / "plain", quiet=True)
+    for enc in ("tail", "delta"):
+        for fmt in ("npy", "npz"):
+            run_dir = save_run({"t": t, "traj": traj}, {}, fmt=fmt, encoding=enc,
+                               root=tmp_path / enc / fmt, quiet=True)
+            back = load_array(run_dir, "traj")
+            assert back.dtype == np.int32 and np.array_equal(back, traj)
+        size = (tmp_path / enc / "npy" / "last" / "traj.npy").stat().st_size
+        assert size < (plain / "traj.npy").stat().st_size / (4 if enc == "tail" else 1.5)   # delta: uint8
+    interp = np.array([[10.0, 7.5, 5.0]])
+    run_dir = save_run({"t": t[:3], "traj": interp}, {}, root=tmp_path / "float", quiet=True)
+    assert load_array(run_dir, "traj").dtype == np.float64
+
+
+def test_chunked_writer_matches_binomial_engine(monkeypatch, tmp_path):
+    """
+    Writing traj incrementally gives exactly the binomial engine's result,
+    and save=False leaves no run on disk.
+    """
+    monkeypatch.chdir(tmp_path)
+    iso = Isotope("X", N0=1000, half_life=2.0)
+    cfg = SimConfig(dt=0.1, T=5.0, n_realizations=7, save=False)
+    _, traj = simulate_isotope(iso, cfg, np.random.default_rng(2))
+    assert not (tmp_path / "data").exists()
+
+    t, N, run_dir = simulate_to_store(iso, cfg, np.random.default_rng(2), chunk_steps=8)
+    assert np.array_equal(load_array(run_dir, "traj"), traj)
+    assert np.allclose(N, traj.mean(axis=0))
+
+
+def test_reader_reduces_in_row_chunks_and_caches(monkeypatch, tmp_path):
+    """
+    RunReader's chunked mean/CI over a memory-mapped traj equals
+    mean_and_ci on the full matrix, and the result is cached in derived/.
+    """
+    from src import runreader
+    from src.analysis import mean_and_ci
+
+    monkeypatch.setattr(runreader, "CHUNK_BYTES", 64)          # force many row chunks
+    rng = np.random.default_rng(0)
+    traj = np.sort(rng.integers(0, 1000, size=(50, 12)), axis=1)[:, ::-1].astype(float)
+    m, half = mean_and_ci(traj)
+    for fmt in ("npy", "chunked"):
+        run_dir = save_run({"t": np.arange(12.0), "traj": traj}, {}, fmt=fmt,
+                           root=tmp_path / fmt, chunk_steps=5, quiet=True)
+        run = runreader.RunReader(run_dir)
+        assert isinstance(run.array("traj"), np.memmap) or fmt == "chunked"
+        assert np.allclose(run.mean(), m)
+        m_r, half_r = run.mean_and_ci()
+        assert np.allclose(m_r, m) and np.allclose(half_r[1:], half[1:])
+        assert (run_dir / "derived" / "N_mean.npy").exists()
+        assert (run_dir / "derived" / "N_ci0.95.npy").exists()
+
+
+def test_reader_variance_is_stable_for_large_counts(monkeypatch, tmp_path):
+    """
+    Chunked CI of counts near 10^12 (spread ~10) agrees with the CI of the
+    shifted counts: per-chunk Welford/Chan merging, no sum-of-squares cancellation.
+    """
+    from src import runreader
+    from src.analysis import mean_and_ci
+
+    monkeypatch.setattr(runreader, "CHUNK_BYTES", 64)
+    rng = np.random.default_rng(1)
+    small = rng.integers(0, 20, size=(40, 6))
+    run_dir = save_run({"t": np.arange(6.0), "traj": small + 10**12}, {}, root=tmp_path, quiet=True)
+    m, half = runreader.RunReader(run_dir).mean_and_ci()
+    m_ref, half_ref = mean_and_ci(small.astype(float))
+    assert np.allclose(m - 10**12, m_ref, atol=1e-3) and np.allclose(half, half_ref, rtol=1e-4)
@@ -0,0 +1,227 @@
+from dataclasses import replace
+import numpy as np
+from src.decay import Isotope
+from src.simulate import SimConfig, simulate_isotope
+
+
+def test_exact_engine_matches_theory_on_sparse_grid(monkeypatch, tmp_path):
+    """
+    The exact engine takes any output grid (here non-uniform) and its mean
+    follows N0*exp(-lam*t) with no dt error, for both sampling strategies.
+    """
+    monkeypatch.chdir(tmp_path)
+    t_eval = np.array([0.0, 0.3, 1.0, 2.5, 7.0, 20.0])
+    for n0 in (4, 20000):   # N0 <= len(t): decay-time sampling; else gap jumps
+        iso = Isotope("X", N0=n0, half_life=2.0)
+        cfg = SimConfig(dt=0.05, T=20.0, n_realizations=4000, engine="exact", t_eval=t_eval)
+        t, traj = simulate_isotope(iso, cfg, np.random.default_rng(3))
+
+        assert traj.shape == (4000, t_eval.size)
+        assert np.all(np.diff(traj, axis=1) <= 0)
+        rel = traj.mean(axis=0) / iso.N_analytical(t)
+        assert np.allclose(rel[:4], 1.0, atol=0.05)
+
+
+def test_batch_sweep_grid_has_labelled_axes():
+    """
+    A 3 N0 x 4 dt sweep runs as one batch; coarse-dt populations are NaN
+    past their own grid and means follow theory.
+    """
+    from src.simulate import simulate_batch
+
+    n0 = np.array([2000, 10000, 50000])[:, None]
+    dt = np.array([0.5, 1.0, 2.0, 5.0])[None, :]
+    lam = np.log(2) / 10.0
+    res = simulate_batch(n0, lam, dt, T=20.0, n_realizations=50, rng=np.random.default_rng(1),
+                         dims=("N0", "dt"))
+
+    assert res.dims == ("realization", "N0", "dt", "time")
+    assert res.traj.shape == (50, 3, 4, 41)
+    assert np.isnan(res.traj[:, :, 3, 5:]).all()          # dt=5 -> 5 columns
+    mean = res.mean()
+    theory = n0[..., None] * np.exp(-lam * res.t)
+    ok = ~np.isnan(mean)
+    assert np.allclose(mean[ok], theory[ok], rtol=0.05)
+
+
+def test_stream_summary_equals_full_traj_statistics(monkeypatch, tmp_path):
+    """
+    Streaming the binomial engine gives the same mean/CI/min/max as the full
+    traj matrix for the same seed, plus quantiles and a trajectory subsample.
+    """
+    from src.analysis import mean_and_ci
+    from src.simulate import simulate_stream
+
+    monkeypatch.chdir(tmp_path)
+    iso = Isotope("X", N0=3000, half_life=2.0)
+    cfg = SimConfig(dt=0.1, T=6.0, n_realizations=200, engine="binomial")
+    t, traj = simulate_isotope(iso, cfg, np.random.default_rng(5))
+    res = simulate_stream(iso, cfg, np.random.default_rng(5), quantiles=(0.5,), keep=3)
+
+    m, half = mean_and_ci(traj)
+    m_s, half_s = res.mean_and_ci()
+    assert np.allclose(m_s, m) and np.allclose(half_s, half)
+    assert np.array_equal(res.stats.min, traj.min(axis=0))
+    assert np.array_equal(res.quantiles[0.5], np.median(traj, axis=0))
+    assert np.array_equal(res.sample, traj[:3])
+
+
+def test_stream_draws_match_full_traj_for_any_step():
+    """
+    Every binomial path shares step_probability, so streaming reproduces
+    simulate_isotope exactly also where 1 - e^{-λdt} and expm1 round apart.
+    """
+    from src.simulate import simulate_stream
+    for lam, dt in ((0.37, 0.1), (1e-6, 0.3), (3e-9, 1.0), (2.5, 0.7)):
+        cfg = SimConfig(dt=dt, T=20 * dt, n_realizations=50, engine="binomial", save=False)
+        iso = Isotope("X", N0=10**12, lam=lam)
+        _, traj = simulate_isotope(iso, cfg, np.random.default_rng(8))
+        res = simulate_stream(iso, cfg, np.random.default_rng(8), keep=50)
+        assert np.array_equal(res.sample, traj)
+        assert np.array_equal(res.stats.min, traj.min(axis=0)) and np.array_equal(res.stats.max, traj.max(axis=0))
+
+
+def test_numba_engine_reproducible_from_rng(monkeypatch, tmp_path):
+    """
+    The parallel numba kernel is seeded from the caller's rng, so the same
+    seed reproduces the same trajectories.
+    """
+    from src.simulate import NUMBA_AVAILABLE
+    if not NUMBA_AVAILABLE:
+        import pytest
+        pytest.skip("numba not installed")
+
+    monkeypatch.chdir(tmp_path)
+    iso = Isotope("X", N0=20000, half_life=5.0)
+    cfg = SimConfig(dt=0.1, T=10.0, n_realizations=16, engine="numba")
+    t, a = simulate_isotope(iso, cfg, np.random.default_rng(11))
+    _, b = simulate_isotope(iso, cfg, np.random.default_rng(11))
+
+    assert np.array_equal(a, b)
+    assert np.allclose(a.mean(axis=0), iso.N_analytical(t), rtol=0.02)
+
+
+def test_numba_kernel_matches_binomial_engine_statistics():
+    """
+    Same step_probability as the binomial engine: per seed the numba kernel
+    is reproducible, and its mean and variance agree with the numpy engine's.
+    """
+    import pytest
+    pytest.importorskip("numba")
+    iso = Isotope("X", N0=5000, half_life=2.0)
+    cfg = SimConfig(dt=0.05, T=6.0, n_realizations=400, engine="numba", save=False)
+    t, a = simulate_isotope(iso, cfg, np.random.default_rng(21))
+    _, b = simulate_isotope(iso, cfg, np.random.default_rng(21))
+    _, c = simulate_isotope(iso, cfg, np.random.default_rng(22))
+    assert np.array_equal(a, b) and not np.array_equal(a, c)
+
+    _, ref = simulate_isotope(iso, replace(cfg, engine="binomial"), np.random.default_rng(21))
+    se = np.sqrt(a.var(axis=0, ddof=1) / a.shape[0] + ref.var(axis=0, ddof=1) / ref.shape[0])
+    live = se > 0
+    assert np.all(np.abs(a.mean(axis=0) - ref.mean(axis=0))[live] < 5 * se[live])
+    S = np.exp(-iso.lam * t)
+    assert np.allclose(a.var(axis=0, ddof=1)[1:], (iso.N0 * S * (1 - S))[1:], rtol=0.25)
+
+def test_deterministic_mode_is_analytic_on_any_grid(monkeypatch, tmp_path):
+    """
+    mode="deterministic" evaluates N and A in closed form on a non-uniform
+    grid and saves no traj; decay_table does many isotopes in one call.
+    """
+    monkeypatch.chdir(tmp_path)
+    from src.decay import decay_table, mixture_counts_analytical
+    from src.runreader import list_arrays
+    from src.simulate import run
+
+    t_eval = np.array([0.0, 0.01, 0.5, 3.0, 40.0])
+    t, traj, run_dir = run(0.2, n0=1000, mode="deterministic", t_eval=t_eval)
+    assert np.array_equal(t, t_eval)
+    assert np.allclose(traj[0], 1000 * np.exp(-0.2 * t_eval))
+    assert list_arrays(run_dir) == ["A", "N", "t"]
+
+    isos = [Isotope("A", N0=100, half_life=1.0), Isotope("B", N0=50, lam=0.05)]
+    N, A = decay_table([i.N0 for i in isos], [i.lam for i in isos], t_eval)
+    assert N.shape == (2, t_eval.size)
+    assert np.allclose(N[1], isos[1].N_analytical(t_eval)) and np.allclose(A[0], isos[0].activity(t_eval))
+    assert np.allclose(mixture_counts_analytical(isos, t_eval)[0], N.sum(axis=0))
+    N1, A1 = mixture_counts_analytical(isos, 3.0)
+    assert np.ndim(N1) == 0 and np.ndim(A1) == 0 and np.isclose(N1, N[:, 3].sum())
+
+
+def test_compact_engines_match_float64():
+    """
+    Integer engines fill traj in signed int32 with the same draws as float64
+    (differences never wrap), and Trajectories gives the same mean/CI lazily.
+    """
+    from src.analysis import Trajectories, mean_and_ci
+    iso = Isotope("X", N0=5000, half_life=1.0)
+    for engine in ("binomial", "per_nucleus", "exact"):
+        R = 3 if engine == "per_nucleus" else 40
+        small = SimConfig(dt=0.1, T=4.0, n_realizations=R, engine=engine, save=False)
+        big = SimConfig(dt=0.1, T=4.0, n_realizations=R, engine=engine, save=False, count_dtype="float64")
+        t, traj = simulate_isotope(iso, small, np.random.default_rng(5))
+        _, ref = simulate_isotope(iso, big, np.random.default_rng(5))
+        assert traj.dtype == np.int32 and ref.dtype == np.float64
+        assert np.array_equal(traj, ref) and np.diff(traj, axis=1).min() < 0
+
+    tr = Trajectories(t, traj)
+    m, half = mean_and_ci(ref)
+    assert tr.nbytes * 2 == ref.nbytes
+    assert np.allclose(tr.mean_and_ci()[0], m) and np.allclose(tr.mean_and_ci()[1], half)
+
+
+def test_adaptive_engine_uses_fewer_draws_within_tolerance():
+    """
+    The adaptive engine takes coarse jumps once decays get sparse: far fewer
+    binomial draws than output points, an unbiased mean and per-realization
+    spread close to the exact engine's.
+    """
+    from src.simulate import _simulate_adaptive
+    t = np.arange(0, 30.0 + 1e-9, 0.01)
+    iso = Isotope("X", N0=10000, lam=0.3)
+    traj, n_steps = _simulate_adaptive(iso.N0, iso.lam, t, 2000, np.random.default_rng(1), tol=1.0)
+
+    assert n_steps < t.size / 2
+    ref = iso.N_analytical(t)
+    sd = np.sqrt(ref * -np.expm1(-iso.lam * t))
+    assert np.all(np.abs(traj.mean(axis=0) - ref) <= 5 * sd / np.sqrt(2000) + 1e-9)
+    late = t > 15
+    assert np.allclose(traj.std(axis=0)[late].mean() / sd[late].mean(), 1.0, atol=0.1)
+
+    cfg = SimConfig(dt=0.01, T=30.0, n_realizations=10, engine="adaptive", tol=1.0, save=False)
+    t2, traj2 = simulate_isotope(iso, cfg, np.random.default_rng(1))
+    assert traj2.shape == (10, t.size)
+
+
+def test_adaptive_run_saves_interpolated_traj_unchanged(monkeypatch, tmp_path):
+    """The adaptive engine's fractional (interpolated) counts are never truncated to integers on save."""
+    from src.runreader import load_array
+    from src.simulate import run
+    monkeypatch.chdir(tmp_path)
+    for store in ("npy", "npz", "chunked"):
+        _, traj, run_dir = run(0.3, n0=20000, tmax=30.0, dt=0.01, seed=2, realizations=5,
+                               engine="adaptive", store=store, cache=False)
+        assert not np.array_equal(traj, np.rint(traj))
+        back = load_array(run_dir, "traj")
+        assert back.dtype == np.float64 and np.array_equal(back, traj)
+
+
+def test_mixture_engine_matches_analytic_for_huge_n0():
+    """
+    Multinomial bin sampling of a 3-isotope source with 10^12 nuclei is
+    unbiased against the analytic mixture and its decays add up.
+    """
+    from src.decay import decay_table, mixture_counts_analytical
+    from src.simulate import simulate_mixture
+    isos = [Isotope("A", N0=10**12, half_life=1.0), Isotope("B", N0=3 * 10**11, half_life=7.0),
+            Isotope("C", N0=50, half_life=0.2)]
+    t = np.array([0.0, 0.1, 0.5, 1.0, 3.0, 10.0])
+    res = simulate_mixture(isos, t, 200, np.random.default_rng(4))
+    assert res.N.shape == (200, 3, t.size) and res.decays.shape == (200, 3, t.size - 1)
+    assert np.array_equal(res.N[..., :-1] - res.N[..., 1:], res.decays)
+
+    N_th, A_th = decay_table([i.N0 for i in isos], [i.lam for i in isos], t)
+    sd = np.sqrt(N_th * (1 - N_th / N_th[:, :1]) / 200) + 1e-9
+    assert np.all(np.abs(res.N.mean(axis=0) - N_th) < 5 * sd)
+    total = res.total().mean(axis=0)
+    assert np.allclose(total, mixture_counts_analytical(isos, t)[0], rtol=1e-5)
+    assert res.total_activity().shape == (200, t.size - 1)
@@ -0,0 +1,48 @@
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Import-time budgets (seconds, from `python -X importtime`); generous enough
+# for slow CI runners but far below what scipy/matplotlib/numba would cost.
+HELP_BUDGET = 0.25
+SIMULATE_BUDGET = 1.0
+HEAVY = ("scipy", "matplotlib", "numba")
+
+
+def _import_profile(*args, cwd):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.cli", *args],
+                          capture_output=True, text=True, cwd=cwd, check=True,
+                          env={"PYTHONPATH": str(ROOT), "PATH": ""})
+    modules, total_us = set(), 0
+    for line in proc.stderr.splitlines():
+        m = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( +)(\S+)", line)
+        if m:
+            modules.add(m.group(3).split(".")[0])
+            if len(m.group(2)) == 1:          # top-level import: count its cumulative time
+                total_us += int(m.group(1))
+    return modules, total_us / 1e6
+
+
+def test_help_imports_nothing_heavy(tmp_path):
+    """
+    `raddecay --help` must not import NumPy or any heavy dependency.
+    """
+    modules, seconds = _import_profile("--help", cwd=tmp_path)
+    assert not modules & {"numpy", *HEAVY}
+    assert seconds < HELP_BUDGET
+
+
+def test_simulate_startup_budget(tmp_path):
+    """
+    A plain simulate run (MC or deterministic) pays for NumPy only: no SciPy,
+    matplotlib or numba.
+    """
+    for mode in ("mc", "deterministic"):
+        modules, seconds = _import_profile("simulate", "--mode", mode, "--lambda", "0.2", "--n0", "100",
+                                           "--tmax", "1", "--dt", "0.1", "--seed", "1", cwd=tmp_path)
+        assert "numpy" in modules
+        assert not modules & set(HEAVY)
+        assert seconds < SIMULATE_BUDGET